@@ -0,0 +1,163 @@
+"""
+Асинхронный клиент API пользователей на asyncio streams (без сторонних библиотек).
+Вместо потока на каждый запрос, как в ThreadPoolExecutor.map(get_user, ...), все запросы
+выполняются в одном потоке, а количество одновременных запросов ограничено семафором.
+Соединения с сервером переиспользуются (keep-alive).
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import urlsplit
+
+from users_client import BASE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncUserClient:
+    """
+    Асинхронный клиент API пользователей.
+    : base_url: адрес API (http или https)
+    : concurrency: максимальное количество одновременных запросов и открытых соединений
+    : timeout: время ожидания ответа на один запрос в секундах
+    """
+
+    def __init__(self, base_url=BASE_URL, *, concurrency=100, timeout=10.0):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.ssl = url.scheme == "https"
+        self.port = url.port or (443 if self.ssl else 80)
+        self.path = url.path.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # свободные соединения (reader, writer)
+        self._idle = []
+
+    async def _request(self, path):
+        """
+        Выполняет GET-запрос и возвращает (статус, тело ответа).
+        Сервер может закрыть простаивающее keep-alive соединение, поэтому если переиспользованное
+        соединение оказалось закрытым, запрос один раз повторяется на новом соединении
+        """
+        if self._idle:
+            reader, writer = self._idle.pop()
+            try:
+                return await self._exchange(reader, writer, path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                logger.debug("Idle connection was closed by server, reconnecting")
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        return await self._exchange(reader, writer, path)
+
+    async def _exchange(self, reader, writer, path):
+        """
+        Отправляет запрос по соединению и читает ответ. Соединение возвращается в _idle, если сервер его не закрыл
+        """
+        try:
+            writer.write(
+                f"GET {self.path}{path} HTTP/1.1\r\n"
+                f"Host: {self.host}\r\n"
+                "Accept: application/json\r\n"
+                "Connection: keep-alive\r\n\r\n".encode()
+            )
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed by server")
+            status = int(status_line.split()[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            else:
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, body
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if not size:
+                await reader.readline()
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def get_user(self, user_id: int):
+        """
+        Получение одного пользователя
+        """
+        async with self._semaphore:
+            status, body = await asyncio.wait_for(self._request(f"/users/{user_id}"), self.timeout)
+        if status != 200:
+            raise RuntimeError(f"GET /users/{user_id} failed with status {status}")
+        result = json.loads(body)
+        logger.info("Got user %s", result)
+
+        return result
+
+    async def iter_users(self, user_ids, return_exceptions=False):
+        """
+        Асинхронный генератор: отдает пользователей по мере получения ответов, а не в порядке user_ids.
+        Одновременно выполняется не больше concurrency запросов, поэтому память не растет
+        с количеством идентификаторов.
+        Как в asyncio.gather: по умолчанию первая ошибка запроса выбрасывается из генератора,
+        а остальные запросы отменяются; с return_exceptions=True ошибки отдаются наравне с пользователями
+
+        :param user_ids: идентификаторы пользователей (любой итерируемый объект)
+        :param return_exceptions: отдавать ли исключения вместо того, чтобы прерывать генератор
+        """
+        ids = iter(user_ids)
+        results = asyncio.Queue(self.concurrency)
+        finished = object()
+
+        async def worker():
+            for user_id in ids:
+                try:
+                    await results.put(await self.get_user(user_id))
+                except Exception as exc:
+                    await results.put(exc)
+            await results.put(finished)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                item = await results.get()
+                if item is finished:
+                    running -= 1
+                elif isinstance(item, Exception) and not return_exceptions:
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def get_users(self, user_ids):
+        """
+        Получение нескольких пользователей, результат - в порядке user_ids
+        """
+        return list(await asyncio.gather(*(self.get_user(user_id) for user_id in user_ids)))
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
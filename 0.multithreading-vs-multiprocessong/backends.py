@@ -0,0 +1,98 @@
+"""
+Выбор способа параллельного выполнения CPU bound задач.
+Процессы дают настоящий параллелизм, но их запуск и передача данных через pickle стоят дорого.
+В новых версиях Python есть более дешевые варианты:
+- интерпретаторы со своим GIL (concurrent.futures.InterpreterPoolExecutor, Python 3.14+);
+- free-threaded сборка Python без GIL (3.13t+), где обычные потоки выполняются параллельно.
+CpuPool выбирает лучший доступный вариант, а если ни одного нет - использует процессы.
+"""
+import concurrent.futures
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PROCESSES = "processes"
+INTERPRETERS = "interpreters"
+THREADS = "threads"
+
+
+def gil_disabled() -> bool:
+    """
+    Возвращает True, если интерпретатор работает без GIL (free-threaded сборка)
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def available_backends() -> list[str]:
+    """
+    Возвращает способы выполнения, доступные в текущем интерпретаторе
+    """
+    backends = [PROCESSES]
+    if hasattr(concurrent.futures, "InterpreterPoolExecutor"):
+        backends.append(INTERPRETERS)
+    if gil_disabled():
+        backends.append(THREADS)
+    return backends
+
+
+def select_backend() -> str:
+    """
+    Выбирает самый дешевый по запуску способ, который дает параллельное выполнение:
+    потоки без GIL, затем интерпретаторы, затем процессы
+    """
+    backends = available_backends()
+    for backend in (THREADS, INTERPRETERS, PROCESSES):
+        if backend in backends:
+            return backend
+
+
+def make_executor(backend: str, max_workers=None) -> concurrent.futures.Executor:
+    """
+    Создает исполнитель для выбранного способа
+    """
+    if backend == PROCESSES:
+        return ProcessPoolExecutor(max_workers)
+    if backend == INTERPRETERS:
+        return concurrent.futures.InterpreterPoolExecutor(max_workers)
+    if backend == THREADS:
+        return ThreadPoolExecutor(max_workers)
+    raise ValueError(f"Unknown backend {backend!r}")
+
+
+class CpuPool:
+    """
+    Пул для CPU bound задач с интерфейсом multiprocessing.Pool (map, контекстный менеджер).
+    : backend: "processes", "interpreters" или "threads" (по умолчанию - select_backend())
+    : processes: количество воркеров (по умолчанию - количество ядер)
+    """
+
+    def __init__(self, processes=None, backend=None):
+        self.backend = backend or select_backend()
+        if self.backend not in available_backends():
+            raise ValueError(f"Backend {self.backend!r} is not available in Python {sys.version.split()[0]}")
+        self._executor = make_executor(self.backend, processes)
+        logger.info("Started %s pool", self.backend)
+
+    def map(self, func, iterable, chunksize=1):
+        """
+        Аналог Pool.map: список результатов в порядке аргументов
+        """
+        return list(self._executor.map(func, iterable, chunksize=chunksize))
+
+    def apply_async(self, func, args=(), kwds=None):
+        """
+        Аналог Pool.apply_async, возвращает concurrent.futures.Future
+        """
+        return self._executor.submit(func, *args, **(kwds or {}))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
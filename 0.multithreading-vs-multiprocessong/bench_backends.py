@@ -0,0 +1,50 @@
+"""
+Сравнение способов выполнения CPU bound задач из backends.py.
+Запуск пула - время создания пула и выполнения одной пустой задачи (важно для коротких всплесков нагрузки).
+Пропускная способность - сколько задач countdown(0, 1_000_000) в секунду выполняет пул.
+Недоступные в текущей версии Python способы пропускаются.
+Запуск: python bench_backends.py
+"""
+from timeit import default_timer
+
+from backends import CpuPool, available_backends
+from chunked import countdown
+
+TASKS = 32
+TASK_SIZE = 1_000_000
+
+
+def noop(_):
+    return None
+
+
+def task(_):
+    return countdown(0, TASK_SIZE)
+
+
+def bench_startup(backend):
+    start_time = default_timer()
+    with CpuPool(backend=backend) as pool:
+        pool.map(noop, [None])
+    return default_timer() - start_time
+
+
+def bench_throughput(backend):
+    with CpuPool(backend=backend) as pool:
+        # прогрев: воркеры уже запущены и модули импортированы
+        pool.map(noop, [None])
+        start_time = default_timer()
+        pool.map(task, range(TASKS))
+        return TASKS / (default_timer() - start_time)
+
+
+def main():
+    for backend in available_backends():
+        print(
+            f"{backend:>12}: startup {bench_startup(backend) * 1000:.1f} ms, "
+            f"throughput {bench_throughput(backend):.1f} tasks/s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Масштабирование pool.map и chunked_map на 1..N ядрах.
+Загрузка ядер = время на одном ядре / (время * количество ядер); 100% - идеальное масштабирование.
+Запуск: python bench_chunked.py [множитель размера задач, по умолчанию 1.0]
+"""
+import multiprocessing
+import sys
+from timeit import default_timer
+
+from chunked import chunked_map, countdown
+
+
+def whole_task(total):
+    return countdown(0, total)
+
+
+def bench(totals, processes, chunked):
+    with multiprocessing.Pool(processes) as pool:
+        start_time = default_timer()
+        if chunked:
+            chunked_map(countdown, totals, processes=processes, pool=pool)
+        else:
+            pool.map(whole_task, totals)
+        return default_timer() - start_time
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    totals = [int(64_000_000 * scale), int(72_000_000 * scale)]
+    baseline = bench(totals, 1, chunked=False)
+    print(f"1 core: {baseline:.3f} s")
+
+    for processes in range(2, multiprocessing.cpu_count() + 1):
+        for chunked in (False, True):
+            total_time = bench(totals, processes, chunked)
+            utilization = baseline / (total_time * processes)
+            name = "chunked_map" if chunked else "pool.map"
+            print(f"{processes:>2} cores {name:>11}: {total_time:.3f} s, utilization {utilization:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Проверка совпадения результатов и сравнение скорости вариантов обратного отсчета из kernels.py.
+Запуск: python bench_kernels.py
+
+Результаты:
+countdown_python(64_000_000): 4.075 s
+countdown_blocks(64_000_000): 1.584 s
+ countdown_numpy(64_000_000): 0.090 s
+countdown_python(72_000_000): 5.455 s
+countdown_blocks(72_000_000): 1.576 s
+ countdown_numpy(72_000_000): 0.193 s
+"""
+from timeit import default_timer
+
+from kernels import countdown_blocks, countdown_numpy, countdown_python, np
+
+
+def check_equivalence():
+    """
+    Все варианты должны давать тот же результат, что и цикл, в том числе на границах блоков
+    """
+    for timeout in (0, 1, 2, 7, 1023, 1024, 1025, 100_000):
+        expected = countdown_python(timeout)
+        assert countdown_blocks(timeout, block_size=1024) == expected, timeout
+        if np is not None:
+            assert countdown_numpy(timeout, block_size=1024) == expected, timeout
+    print("all kernels are equivalent")
+
+
+def main():
+    check_equivalence()
+    kernels = [countdown_python, countdown_blocks]
+    if np is not None:
+        kernels.append(countdown_numpy)
+
+    for timeout in (64_000_000, 72_000_000):
+        for kernel in kernels:
+            start_time = default_timer()
+            kernel(timeout)
+            print(f"{kernel.__name__:>16}({timeout:_}): {default_timer() - start_time:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
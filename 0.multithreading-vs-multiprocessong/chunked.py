@@ -0,0 +1,87 @@
+"""
+Балансировка нагрузки в пуле процессов.
+pool.map(cpu_expensive, [64_000_000, 72_000_000]) отдает каждому воркеру целую задачу,
+поэтому при двух задачах работают два ядра, а пока считается самая длинная задача, остальные простаивают.
+Здесь каждая задача режется на части: сначала крупные, к концу все мельче (guided scheduling),
+воркеры забирают части по мере освобождения (imap_unordered), а частичные результаты складываются.
+"""
+import logging
+import multiprocessing
+import operator
+from functools import reduce
+
+logger = logging.getLogger(__name__)
+
+
+def countdown(start: int, stop: int) -> int:
+    """
+    Часть работы cpu_expensive: обратный отсчет на stop - start шагов
+
+    :return: количество выполненных шагов - частичный результат для суммирования
+    """
+    steps = timeout = stop - start
+    while timeout:
+        timeout -= 1
+    return steps
+
+
+def split_range(total: int, workers: int, min_chunk: int = 1_000_000):
+    """
+    Делит диапазон [0, total) на части уменьшающегося размера: каждая часть - это половина
+    остатка, поделенного на количество воркеров, но не меньше min_chunk.
+    Крупные части в начале уменьшают накладные расходы, мелкие в конце выравнивают загрузку ядер.
+    Пустой диапазон дает одну пустую часть, чтобы у каждой задачи был результат
+
+    :return: генератор пар (start, stop)
+    """
+    start = 0
+    while True:
+        size = max(min_chunk, (total - start) // (2 * workers))
+        stop = min(start + size, total)
+        yield start, stop
+        if stop >= total:
+            return
+        start = stop
+
+
+def _run_chunk(job):
+    task_index, func, start, stop = job
+    return task_index, func(start, stop)
+
+
+def chunked_map(func, totals, processes=None, min_chunk=1_000_000, combine=operator.add, pool=None):
+    """
+    Параллельный map для задач, которые можно разбить на диапазоны
+
+    :param func: функция func(start, stop), считающая часть задачи (должна быть доступна по имени модуля)
+    :param totals: размеры задач, например [64_000_000, 72_000_000]
+    :param processes: количество процессов (по умолчанию - количество ядер)
+    :param min_chunk: минимальный размер части
+    :param combine: функция сложения частичных результатов
+    :param pool: готовый multiprocessing.Pool (иначе создается новый)
+    :return: список результатов в порядке totals
+    """
+    totals = list(totals)
+    processes = processes or multiprocessing.cpu_count()
+    jobs = [
+        (task_index, func, start, stop)
+        for task_index, total in enumerate(totals)
+        for start, stop in split_range(total, processes, min_chunk)
+    ]
+    # самые крупные части отправляем первыми, чтобы мелкие заполнили хвост
+    jobs.sort(key=lambda job: job[3] - job[2], reverse=True)
+
+    partials = [[] for _ in totals]
+    own_pool = pool is None
+    if own_pool:
+        pool = multiprocessing.Pool(processes)
+    try:
+        for task_index, partial in pool.imap_unordered(_run_chunk, jobs):
+            partials[task_index].append(partial)
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+
+    logger.info("Done %d tasks in %d chunks", len(totals), len(jobs))
+    return [reduce(combine, results) for results in partials]
@@ -1,35 +1,128 @@
+import atexit
+import inspect
 import logging
+import multiprocessing
+import os
+import queue
 from functools import wraps
 from timeit import default_timer
 
+from log_queue import BatchingQueueListener, OverflowQueueHandler
+from metrics import get_histogram
+
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = "[%(asctime)s.%(msecs)03d] %(funcName)15s %(module)7s:%(lineno)d %(levelname)-6s - %(message)s"
+LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
 
-def configure_logging():
+def configure_logging(queued=False, *, multiprocess=False, queue_size=10_000, overflow="drop", batch_size=256):
     """
-    Настраивает логирование для приложения
+    Настраивает логирование для приложения.
+    В режиме queued вызов logger.info только кладет запись в очередь, а пишет ее фоновый поток,
+    поэтому логирование не блокирует рабочие потоки на вводе-выводе
+
+    :param queued: писать логи через очередь
+    :param multiprocess: использовать multiprocessing.Queue, чтобы воркеры пула отправляли записи
+        в этот процесс (в воркере вызывается configure_worker_logging(listener.queue)).
+        Без него очередь видна только этому процессу, и в процессах, запущенных через fork
+        (например, воркерах multiprocessing.Pool), логирование переключается на прямой вывод
+    :param queue_size: максимальное количество записей в очереди
+    :param overflow: что делать при переполнении очереди: "drop" - отбросить запись, "block" - ждать
+    :param batch_size: максимальное количество записей, которые пишутся одной операцией
+    :return: BatchingQueueListener в режиме queued, иначе None
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        datefmt="%Y-%m-%d %H:%M:%S",
-        format="[%(asctime)s.%(msecs)03d] %(funcName)15s %(module)7s:%(lineno)d %(levelname)-6s - %(message)s",
+    if not queued:
+        logging.basicConfig(
+            level=logging.INFO,
+            datefmt=LOG_DATEFMT,
+            format=LOG_FORMAT,
+        )
+        return None
+
+    log_queue = multiprocessing.Queue(queue_size) if multiprocess else queue.Queue(queue_size)
+    handler = OverflowQueueHandler(log_queue, overflow)
+    listener = BatchingQueueListener(
+        log_queue,
+        logging.Formatter(LOG_FORMAT, LOG_DATEFMT),
+        batch_size=batch_size,
+        handlers=[handler],
     )
+    listener.start()
+    # при выходе из программы дописываем записи, оставшиеся в очереди
+    atexit.register(listener.stop)
+    if not multiprocess:
+        # queue.Queue не видна другим процессам: унаследованный при fork обработчик клал бы записи в очередь,
+        # которую никто не читает, и они терялись бы ("drop") или воркер зависал бы ("block")
+        os.register_at_fork(after_in_child=_log_directly)
+    # в очередь попадает только текст сообщения, полный формат применяет listener
+    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[handler])
+    return listener
 
 
-def timer(func):
+def _log_directly():
+    logging.basicConfig(level=logging.INFO, datefmt=LOG_DATEFMT, format=LOG_FORMAT, force=True)
+
+
+def configure_worker_logging(log_queue, overflow="drop"):
     """
-    Декоратор для измерения времени
+    Настраивает логирование в воркере multiprocessing.Pool: записи отправляются в очередь
+    родительского процесса. Используется как initializer пула:
+    multiprocessing.Pool(initializer=configure_worker_logging, initargs=(listener.queue,))
     """
-    @wraps(func)
-    def wrapper(*a, **kw):
-        start_time = default_timer()
-        result = func(*a, **kw)
-        total_time = default_timer() - start_time
-        logger.info(
-            "Func %s call total time %.3f",
-            func.__name__,
-            total_time,
-        )
-        return result
+    root = logging.getLogger()
+    root.handlers[:] = [OverflowQueueHandler(log_queue, overflow)]
+    root.setLevel(logging.INFO)
+
+
+def timer(_func=None, *, aggregate=False):
+    """
+    Декоратор для измерения времени.
+    Для корутинных функций (async def) время измеряется до завершения await
+
+    :param _func: передается позиционно, если декоратор применен без параметров
+    :param aggregate: вместо строки лога на каждый вызов копить время в гистограмме
+        (metrics.get_histogram(имя функции)), отчет - metrics.report()
+    :return: функцию из декоратора
+    """
+
+    def decorator(func):
+        if aggregate:
+            histogram = get_histogram(func.__qualname__)
+
+            def done(total_time):
+                histogram.record(int(total_time * 1e9))
+        else:
+            def done(total_time):
+                logger.info(
+                    "Func %s call total time %.3f",
+                    func.__name__,
+                    total_time,
+                    # в логе остается имя обертки, как и раньше, а не done
+                    stacklevel=2,
+                )
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*a, **kw):
+                start_time = default_timer()
+                try:
+                    return await func(*a, **kw)
+                finally:
+                    done(default_timer() - start_time)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*a, **kw):
+            start_time = default_timer()
+            try:
+                return func(*a, **kw)
+            finally:
+                done(default_timer() - start_time)
+
+        return wrapper
 
-    return wrapper
+    if _func is not None:
+        return decorator(_func)
+    return decorator
@@ -0,0 +1,63 @@
+"""
+Векторизованный вариант cpu_expensive.
+Цикл while в cpu_expensive выполняет байт-код интерпретатора на каждом шаге.
+Здесь та же последовательность значений счетчика (timeout, timeout - 1, ..., 1) обрабатывается
+блоками фиксированного размера: с NumPy - операциями над массивами, без NumPy - встроенной sum(range(...)).
+Память ограничена размером блока, а не величиной timeout.
+
+Чтобы результат можно было сравнить, все варианты возвращают сумму значений счетчика.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+BLOCK_SIZE = 1 << 20
+
+
+def countdown_python(timeout: int) -> int:
+    """
+    Эталон: обратный отсчет в цикле, как в cpu_expensive, с суммированием значений счетчика
+    """
+    total = 0
+    while timeout:
+        total += timeout
+        timeout -= 1
+    return total
+
+
+def countdown_blocks(timeout: int, block_size: int = BLOCK_SIZE) -> int:
+    """
+    Обратный отсчет блоками без NumPy: цикл по блоку выполняется внутри sum() на C
+    """
+    total = 0
+    for high in range(timeout, 0, -block_size):
+        total += sum(range(high, max(high - block_size, 0), -1))
+    return total
+
+
+def countdown_numpy(timeout: int, block_size: int = BLOCK_SIZE) -> int:
+    """
+    Обратный отсчет блоками на NumPy.
+    Сумма блока из BLOCK_SIZE значений до 2 ** 40 помещается в int64, общая сумма копится в int Python
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+    total = 0
+    # один буфер на все блоки, чтобы не выделять память на каждой итерации
+    offsets = np.arange(block_size, dtype=np.int64)
+    values = np.empty(block_size, dtype=np.int64)
+    for high in range(timeout, 0, -block_size):
+        size = min(block_size, high)
+        np.subtract(high, offsets[:size], out=values[:size])
+        total += int(values[:size].sum())
+    return total
+
+
+def countdown_vectorized(timeout: int, block_size: int = BLOCK_SIZE) -> int:
+    """
+    Самый быстрый доступный вариант: NumPy, если он установлен, иначе блоки на sum()
+    """
+    if np is not None:
+        return countdown_numpy(timeout, block_size)
+    return countdown_blocks(timeout, block_size)
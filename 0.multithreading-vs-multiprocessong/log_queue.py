@@ -0,0 +1,121 @@
+"""
+Неблокирующее логирование через очередь.
+Потоки и процессы только кладут записи в ограниченную очередь (OverflowQueueHandler),
+а в файл или консоль их пачками пишет один фоновый поток (BatchingQueueListener).
+"""
+import logging
+import queue
+import sys
+import threading
+import traceback
+from logging.handlers import QueueHandler
+from time import monotonic
+
+
+class OverflowQueueHandler(QueueHandler):
+    """
+    QueueHandler с политикой переполнения очереди.
+    : overflow: "drop" - отбросить запись и увеличить счетчик dropped,
+        "block" - ждать, пока в очереди появится место
+    """
+
+    def __init__(self, log_queue, overflow="drop"):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """
+    Забирает записи из очереди в фоновом потоке и пишет их в поток вывода пачками:
+    одна операция write и flush на batch_size записей вместо одной на каждую запись.
+    Очередь может быть queue.Queue (потоки) или multiprocessing.Queue (процессы).
+    : handlers: OverflowQueueHandler этого процесса, о потерянных записях которых listener сообщает в вывод
+        (счетчики обработчиков в воркерах других процессов ему не видны)
+    """
+
+    # признак остановки - None, как и у logging.handlers.QueueListener
+    _sentinel = None
+    # сообщение о потерянных записях выводится не чаще раза в REPORT_INTERVAL секунд
+    REPORT_INTERVAL = 1.0
+
+    def __init__(self, log_queue, formatter, stream=None, batch_size=256, handlers=()):
+        self.queue = log_queue
+        self.formatter = formatter
+        self.stream = stream or sys.stderr
+        self.batch_size = batch_size
+        self.handlers = list(handlers)
+        self._reported = 0
+        self._reported_at = monotonic()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Дописывает оставшиеся в очереди записи и останавливает поток
+        """
+        if self._thread is None:
+            return
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+        # записи, отброшенные после последнего сообщения о потерях
+        self._write([], force_report=True)
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._sentinel in batch:
+                running = False
+                batch = [record for record in batch if record is not self._sentinel]
+            if batch:
+                self._write(batch)
+
+    def _dropped_record(self, force):
+        """
+        Запись о потерянных с прошлого сообщения записях или None, если потерь не было
+        """
+        if not force and monotonic() - self._reported_at < self.REPORT_INTERVAL:
+            return None
+        dropped = sum(handler.dropped for handler in self.handlers)
+        if dropped <= self._reported:
+            return None
+        self._reported_at = monotonic()
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Dropped %d log records: queue is full", (dropped - self._reported,), None, "_write",
+        )
+        self._reported = dropped
+        return record
+
+    def _write(self, batch, force_report=False):
+        dropped = self._dropped_record(force_report)
+        if dropped is not None:
+            batch = [*batch, dropped]
+        if not batch:
+            return
+        try:
+            self.stream.write("".join(self.formatter.format(record) + "\n" for record in batch))
+            self.stream.flush()
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
@@ -3,6 +3,7 @@ import requests
 from time import sleep
 
 from common import configure_logging, timer
+from kernels import countdown_vectorized
 from threading import Thread
 from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
@@ -50,15 +51,19 @@ def get_user(user_id: int):
     return result
 
 
-def cpu_expensive(timeout: int):
+def cpu_expensive(timeout: int, vectorized: bool = False):
     """
     Нагрузка процессора
     *CPU не может ждать несколько отдельных задач
+    vectorized - считать блоками вне интерпретатора (kernels.py), в десятки раз быстрее
     """
     logger.info("Countdown to %s", timeout)
 
-    while timeout:
-        timeout -= 1
+    if vectorized:
+        countdown_vectorized(timeout)
+    else:
+        while timeout:
+            timeout -= 1
 
     logger.info("Done countdown")
 
@@ -117,6 +122,29 @@ def demo_threading():
     #     executor.submit(cpu_expensive, 64_000_000)
     #     executor.submit(cpu_expensive, 72_000_000)
 
+    # 8 - как вариант 5, но соединения с сервером переиспользуются (users_client.py)
+    # from users_client import UserClient
+    # with UserClient() as client:
+    #     client.get_users(range(1, 11))
+
+    # 9 - без потоков, на asyncio (async_users.py); сравнение с пулом потоков - bench_fetch.py
+    # import asyncio
+    # from async_users import AsyncUserClient
+    #
+    # async def fetch():
+    #     async with AsyncUserClient() as client:
+    #         async for user in client.iter_users(range(1, 11)):
+    #             logger.info("Got user %s", user)
+    #
+    # asyncio.run(fetch())
+
+    # 10 - пул сам выбирает потоки или процессы по замеру первого запуска каждой функции (scheduler.py):
+    # первый вызов cpu_expensive замеряется в потоке, второй уходит в процессы, get_user остается в потоках
+    # from scheduler import AdaptiveExecutor
+    # with AdaptiveExecutor() as executor:
+    #     executor.map(get_user, range(1, 11))
+    #     executor.map(cpu_expensive, [64_000_000, 72_000_000])
+
 
 @timer
 def demo_multiprocessing():
@@ -144,6 +172,26 @@ def demo_multiprocessing():
     with multiprocessing.Pool() as pool:
         pool.map(cpu_expensive, [64_000_000, 72_000_000])
 
+    # 3 - у каждого воркера свой кеш, поэтому одинаковые задачи считаются в нескольких процессах.
+    # Общий кеш в разделяемой памяти (shared_cache.py) создается до пула и наследуется воркерами при fork,
+    # тогда каждое значение считается один раз на весь пул (пример - в документации shared_cache.py)
+
+    # 4 - задачи режутся на части, которые воркеры забирают по мере освобождения (chunked.py),
+    # поэтому все ядра заняты до конца, а не ждут самую длинную задачу; замеры - bench_chunked.py
+    # from chunked import chunked_map, countdown
+    # chunked_map(countdown, [64_000_000, 72_000_000])
+
+    # 5 - тот же map, но пул сам выбирает самый дешевый способ (backends.py): потоки без GIL,
+    # интерпретаторы со своим GIL или процессы; замеры - bench_backends.py
+    # from backends import CpuPool
+    # with CpuPool() as pool:
+    #     pool.map(cpu_expensive, [64_000_000, 72_000_000])
+
+    # 6 - воркеры запускаются один раз при первом обращении и переиспользуются между вызовами
+    # demo_multiprocessing (worker_pool.py); пул останавливается при выходе из программы
+    # from worker_pool import warm_pool
+    # warm_pool.get().map(cpu_expensive, [64_000_000, 72_000_000])
+
 
 # ожидание завершения тредов
 logger.info("Done demo threading")
@@ -0,0 +1,228 @@
+"""
+Гистограммы задержек для timer(aggregate=True).
+Вместо строки лога на каждый вызов время копится в гистограмме функции,
+а отчет с перцентилями (p50/p90/p99/max) выводится по запросу или периодически.
+"""
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# 2 ** SUB_BITS ячеек на каждую степень двойки - относительная погрешность не больше 1 / 16
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+# ячеек хватает на любое значение до 2 ** 64 наносекунд
+BUCKETS = (64 - SUB_BITS + 1) * SUB_BUCKETS
+
+
+def bucket_index(value: int) -> int:
+    """
+    Возвращает номер ячейки для значения в наносекундах.
+    Значения меньше SUB_BUCKETS хранятся точно, дальше ширина ячейки растет вместе со значением
+    """
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """
+    Возвращает границы ячейки [нижняя, верхняя)
+    """
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с логарифмическими ячейками (как в HdrHistogram).
+    Запись - O(1) и не выделяет память. Гистограммы можно объединять (merge),
+    например собрать в родительском процессе гистограммы из воркеров пула.
+    """
+
+    def __init__(self):
+        self.counts = array("Q", [0]) * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def record(self, value: int):
+        """
+        Добавляет значение в наносекундах
+        """
+        index = bucket_index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """
+        Добавляет к гистограмме значения другой гистограммы
+        """
+        with self._lock:
+            for index, count in enumerate(other.counts):
+                if count:
+                    self.counts[index] += count
+            self.count += other.count
+            self.total += other.total
+            if other.min is not None and (self.min is None or other.min < self.min):
+                self.min = other.min
+            self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """
+        Возвращает значение, меньше которого percent процентов записей (середина ячейки)
+        """
+        if not self.count:
+            return 0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min((low + high - 1) // 2, self.max)
+        return self.max
+
+    def snapshot(self, reset=False) -> dict:
+        """
+        Возвращает сводку в секундах: count, total, mean, min, p50, p90, p99, max
+
+        :param reset: очистить гистограмму под той же блокировкой, чтобы не потерять записи между сводкой и очисткой
+        """
+        with self._lock:
+            if not self.count:
+                return {"count": 0}
+            stats = {
+                "count": self.count,
+                "total": self.total / 1e9,
+                "mean": self.total / self.count / 1e9,
+                "min": self.min / 1e9,
+                "p50": self.percentile(50) / 1e9,
+                "p90": self.percentile(90) / 1e9,
+                "p99": self.percentile(99) / 1e9,
+                "max": self.max / 1e9,
+            }
+            if reset:
+                self._reset()
+            return stats
+
+    def drain(self) -> "LatencyHistogram":
+        """
+        Возвращает копию накопленных значений и очищает гистограмму одним действием под блокировкой
+        """
+        drained = LatencyHistogram()
+        with self._lock:
+            drained.counts, drained.count, drained.total = self.counts, self.count, self.total
+            drained.min, drained.max = self.min, self.max
+            self._reset()
+        return drained
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.counts = array("Q", [0]) * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+# гистограммы по именам функций
+histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    """
+    Возвращает гистограмму функции, создавая ее при первом обращении
+    """
+    histogram = histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = histograms.setdefault(name, LatencyHistogram())
+    return histogram
+
+
+def drain() -> dict[str, LatencyHistogram]:
+    """
+    Забирает значения, накопленные с прошлого вызова, и очищает гистограммы процесса.
+    Гистограммы накапливают значения, поэтому воркер пула возвращает вместе с результатом задачи drain(),
+    а не сами metrics.histograms: иначе родитель учел бы одни и те же вызовы несколько раз
+    """
+    drained = {}
+    for name, histogram in list(histograms.items()):
+        exported = histogram.drain()
+        if exported.count:
+            drained[name] = exported
+    return drained
+
+
+def merge_histograms(exported: dict[str, LatencyHistogram]):
+    """
+    Объединяет гистограммы, полученные из другого процесса (результат drain() в воркере),
+    с гистограммами текущего процесса
+    """
+    for name, histogram in exported.items():
+        get_histogram(name).merge(histogram)
+
+
+def report(reset=False):
+    """
+    Выводит в лог сводку по всем функциям
+
+    :param reset: очистить гистограммы после отчета
+    """
+    for name, histogram in list(histograms.items()):
+        stats = histogram.snapshot(reset=reset)
+        if not stats["count"]:
+            continue
+        logger.info(
+            "Func %s calls %d total %.3f p50 %.6f p90 %.6f p99 %.6f max %.6f",
+            name,
+            stats["count"],
+            stats["total"],
+            stats["p50"],
+            stats["p90"],
+            stats["p99"],
+            stats["max"],
+        )
+
+
+def start_reporter(interval: float = 60.0, reset=True) -> threading.Event:
+    """
+    Запускает фоновый поток, который выводит отчет каждые interval секунд
+
+    :return: событие, установка которого останавливает поток
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            report(reset=reset)
+
+    threading.Thread(target=run, name="metrics-reporter", daemon=True).start()
+    return stop
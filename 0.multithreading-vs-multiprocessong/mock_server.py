@@ -0,0 +1,70 @@
+"""
+Локальная замена https://jsonplaceholder.typicode.com для тестов и замеров без сети.
+Отдает пользователей по адресу /users/<id> и поддерживает keep-alive (HTTP/1.1).
+"""
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+
+
+class UsersHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов /users/<id>
+    """
+    protocol_version = "HTTP/1.1"
+    # заголовки и тело уходят отдельными пакетами, без TCP_NODELAY keep-alive соединения ждут delayed ACK
+    disable_nagle_algorithm = True
+    # искусственная задержка ответа в секундах, имитирует удаленный сервер
+    latency = 0.0
+
+    def do_GET(self):
+        prefix, _, user_id = self.path.rpartition("/")
+        if prefix != "/users" or not user_id.isdigit():
+            self.send_error(404)
+            return
+        if self.latency:
+            sleep(self.latency)
+        body = json.dumps({
+            "id": int(user_id),
+            "name": f"User {user_id}",
+            "username": f"user{user_id}",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # не засоряем вывод строкой на каждый запрос
+        pass
+
+
+class UsersServer(ThreadingHTTPServer):
+    """
+    Многопоточный сервер с большой очередью входящих соединений,
+    чтобы выдерживать тысячи одновременных клиентов
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+@contextmanager
+def serve_users(latency=0.0, host="127.0.0.1", port=0):
+    """
+    Запускает сервер в фоновом потоке на свободном порту
+
+    :param latency: задержка каждого ответа в секундах
+    :return: базовый адрес сервера, например http://127.0.0.1:54321
+    """
+    handler = type("Handler", (UsersHandler,), {"latency": latency})
+    server = UsersServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="mock-server", daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
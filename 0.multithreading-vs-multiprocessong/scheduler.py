@@ -0,0 +1,221 @@
+"""
+Исполнитель, который сам выбирает между потоками и процессами.
+Первые запуски задачи выполняются в пуле потоков, и для них замеряется доля времени,
+которую поток занимал процессор (а значит, держал GIL). Задачи, которые в основном ждут (I/O bound),
+остаются в потоках, а задачи, которые в основном считают (CPU bound), уходят в пул процессов.
+"""
+import logging
+import pickle
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter, thread_time
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+@dataclass(slots=True)
+class TaskStats:
+    """Статистика одного типа задач (одной функции)."""
+    calls: int = 0
+    probes: int = 0
+    measured: int = 0
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    route: str | None = None
+
+    @property
+    def cpu_ratio(self) -> float:
+        """Доля процессорного времени в общем времени пробных запусков."""
+        return self.cpu_time / self.wall_time if self.wall_time else 0.0
+
+
+def _chain(source: Future, target: Future):
+    """
+    Передает результат или исключение source в target, когда source завершится
+    """
+    def copy(done):
+        exception = done.exception()
+        if exception is not None:
+            target.set_exception(exception)
+        else:
+            target.set_result(done.result())
+
+    source.add_done_callback(copy)
+
+
+def _dispatch(pool, pending):
+    """
+    Отправляет ожидающие вызовы [(future, func, args, kwargs)] в пул
+    """
+    for future, func, args, kwargs in pending:
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            _chain(pool.submit(func, *args, **kwargs), future)
+        except RuntimeError as exc:
+            future.set_exception(exc)
+
+
+def _measure(stats_lock, stats, func, args, kwargs):
+    """
+    Выполняет задачу в потоке и добавляет ее процессорное и общее время в статистику
+    """
+    wall_start, cpu_start = perf_counter(), thread_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        cpu, wall = thread_time() - cpu_start, perf_counter() - wall_start
+        with stats_lock:
+            stats.cpu_time += cpu
+            stats.wall_time += wall
+
+
+class AdaptiveExecutor:
+    """
+    Фасад над ThreadPoolExecutor и ProcessPoolExecutor с интерфейсом concurrent.futures.
+    Пробные запуски выполняются по одному в отдельном потоке, чтобы задачи не отнимали GIL друг у друга
+    и не искажали замер. Пока идет пробный запуск функции, ее следующие вызовы ждут: очередной из них
+    становится следующим пробным запуском, а после последнего замера остальные отправляются в выбранный пул.
+    : probe_runs: сколько первых запусков каждой функции замерять
+    : cpu_threshold: доля процессорного времени, начиная с которой задача считается CPU bound
+    : max_threads: размер пула потоков
+    : max_processes: размер пула процессов (по умолчанию - количество ядер)
+    """
+
+    def __init__(self, probe_runs=1, cpu_threshold=0.5, max_threads=None, max_processes=None):
+        self.probe_runs = probe_runs
+        self.cpu_threshold = cpu_threshold
+        self._probes = ThreadPoolExecutor(1, thread_name_prefix="probe")
+        self._threads = ThreadPoolExecutor(max_threads)
+        self._max_processes = max_processes
+        self._processes = None
+        self._stats: dict[str, TaskStats] = {}
+        # вызовы, ожидающие окончания замеров: имя функции -> [(future, func, args, kwargs)]
+        self._pending: dict[str, list] = {}
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    def _pool(self, route):
+        if route == THREAD:
+            return self._threads
+        # пул процессов создается только когда появилась первая CPU bound задача
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(self._max_processes)
+        return self._processes
+
+    def _decide(self, name, func, stats):
+        """
+        Выбирает пул для функции по результатам пробных запусков
+        """
+        route = THREAD
+        if stats.cpu_ratio >= self.cpu_threshold:
+            try:
+                # в процесс можно отправить только функцию, доступную по имени модуля
+                pickle.dumps(func)
+                route = PROCESS
+            except Exception:
+                logger.info("Func %s is CPU bound but cannot be pickled, keep it in threads", name)
+        stats.route = route
+        logger.info("Func %s cpu ratio %.2f, route to %s pool", name, stats.cpu_ratio, route)
+
+    def _probe(self, name, stats, func, args, kwargs):
+        """
+        Запускает пробный вызов в потоке замеров
+        """
+        future = self._probes.submit(_measure, self._lock, stats, func, args, kwargs)
+        future.add_done_callback(lambda _: self._probe_done(name, func, stats))
+        return future
+
+    def _probe_done(self, name, func, stats):
+        """
+        Запускает следующий пробный вызов из ожидающих, а после последнего
+        выбирает пул и отправляет в него остальные ожидающие вызовы
+        """
+        with self._lock:
+            stats.measured += 1
+            if self._shutdown:
+                # ожидающие вызовы уже отправил shutdown()
+                return
+            pending = self._pending.get(name, [])
+            while stats.measured < self.probe_runs and pending:
+                future, func, args, kwargs = pending.pop(0)
+                if future.set_running_or_notify_cancel():
+                    stats.probes += 1
+                    break
+            else:
+                if stats.measured < self.probe_runs:
+                    # ожидающих вызовов нет, следующий submit станет пробным запуском
+                    return
+                self._decide(name, func, stats)
+                pool = self._pool(stats.route)
+                pending = self._pending.pop(name, [])
+                future = None
+
+        if future is not None:
+            try:
+                _chain(self._probe(name, stats, func, args, kwargs), future)
+            except RuntimeError as exc:
+                # исполнитель остановлен: иначе ожидающий вызов никогда не завершится
+                future.set_exception(exc)
+            return
+        _dispatch(pool, pending)
+
+    def submit(self, func, /, *args, **kwargs):
+        """
+        Планирует выполнение func(*args, **kwargs) и возвращает Future
+        """
+        name = f"{func.__module__}.{func.__qualname__}"
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            stats = self._stats.setdefault(name, TaskStats())
+            stats.calls += 1
+            if stats.route is not None:
+                return self._pool(stats.route).submit(func, *args, **kwargs)
+            # пробный запуск этой функции уже идет: вызов ждет его результата
+            if stats.probes > stats.measured:
+                future = Future()
+                self._pending.setdefault(name, []).append((future, func, args, kwargs))
+                return future
+            stats.probes += 1
+
+        return self._probe(name, stats, func, args, kwargs)
+
+    def map(self, func, *iterables):
+        """
+        Аналог Executor.map: результаты в порядке аргументов
+        """
+        futures = [self.submit(func, *args) for args in zip(*iterables)]
+        return (future.result() for future in futures)
+
+    def stats(self) -> dict[str, TaskStats]:
+        """
+        Возвращает статистику по типам задач
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def shutdown(self, wait=True):
+        """
+        Останавливает пулы. Вызовы, которые еще ждут окончания замеров, отправляются в пул потоков,
+        чтобы их Future завершились
+        """
+        with self._lock:
+            self._shutdown = True
+            pending = [call for calls in self._pending.values() for call in calls]
+            self._pending.clear()
+        _dispatch(self._threads, pending)
+        self._probes.shutdown(wait)
+        self._threads.shutdown(wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,182 @@
+"""
+Кеш в разделяемой памяти (multiprocessing.shared_memory) для воркеров multiprocessing.Pool.
+Результат, вычисленный одним воркером, сразу виден всем остальным.
+
+Интерфейс такой же, как у хранилищ для cached(store=...) и Cached(store=...):
+get(key) выбрасывает KeyError при промахе или для просроченной записи,
+set(key, value, ttl=None) сохраняет значение (на ttl секунд, None - бессрочно).
+
+Пример:
+
+store = SharedMemoryStore()
+
+
+@cached(store=store)
+def task(n):
+    ...
+
+
+with store, multiprocessing.Pool() as pool:
+    pool.map(task, [1, 2, 1, 2])  # каждое значение вычисляется один раз на весь пул
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import pickle
+import struct
+from multiprocessing import shared_memory
+from time import monotonic_ns, time
+
+# заголовок слота: занят ли слот, хеш ключа, время последнего обращения,
+# время истечения по часам системы (0 - бессрочно), длина значения
+_HEADER = struct.Struct("<?16sQdI")
+
+logger = logging.getLogger(__name__)
+
+
+class SharedMemoryStore:
+    """
+    Множественно-ассоциативная хеш-таблица в разделяемой памяти.
+    Таблица разбита на наборы по ways слотов. Ключ попадает в один набор,
+    при переполнении набора вытесняется самый давно использованный слот.
+    Наборы защищены блокировками по модулю locks (lock striping),
+    поэтому процессы, работающие с разными ключами, почти не мешают друг другу.
+    Значения длиннее slot_size байт не кешируются.
+
+    Хранилище нужно создать до запуска пула, и работает оно только с воркерами, запущенными через fork
+    (по умолчанию в Linux): они наследуют разделяемую память и блокировки. При spawn и forkserver воркеры
+    заново импортируют модуль и создали бы каждый свою копию хранилища, поэтому в них хранилище отключено
+    (всегда промах), а передать его воркеру через pickle нельзя.
+    : sets: количество наборов
+    : ways: количество слотов в наборе
+    : slot_size: максимальный размер сериализованного значения в байтах
+    : locks: количество блокировок
+    : serializer: объект с методами dumps/loads
+    : context: контекст multiprocessing с методом запуска fork (по умолчанию get_context("fork"),
+    который не фиксирует метод запуска по умолчанию, в отличие от get_context())
+    """
+
+    def __init__(self, sets=1024, ways=4, slot_size=256, *, locks=64, serializer=pickle, context=None):
+        if context is None:
+            context = multiprocessing.get_context("fork")
+        elif context.get_start_method() != "fork":
+            raise ValueError("SharedMemoryStore supports only the 'fork' start method")
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.serializer = serializer
+        self._slot_bytes = _HEADER.size + slot_size
+        # освобождает память только создавший ее процесс, а не унаследовавшие ее воркеры
+        self._owner_pid = os.getpid()
+        # воркер spawn или forkserver выполняет модуль родителя заново при запуске:
+        # новый сегмент и блокировки были бы видны только этому воркеру и не освобождались бы
+        if getattr(multiprocessing.current_process(), "_inheriting", False):
+            logger.warning("SharedMemoryStore is not shared with spawned workers, use the 'fork' start method")
+            self._locks = []
+            self._shm = None
+            return
+        self._locks = [context.Lock() for _ in range(locks)]
+        self._shm = shared_memory.SharedMemory(create=True, size=sets * ways * self._slot_bytes)
+
+    def __reduce__(self):
+        raise TypeError("SharedMemoryStore is shared with workers by fork and cannot be pickled")
+
+    @staticmethod
+    def _digest(key):
+        if not isinstance(key, bytes):
+            key = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(key) == 16:
+            return key
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _locate(self, digest):
+        """
+        Возвращает смещение набора в памяти и его блокировку
+        """
+        set_index = int.from_bytes(digest[:8], "little") % self.sets
+        return set_index * self.ways * self._slot_bytes, self._locks[set_index % len(self._locks)]
+
+    def get(self, key):
+        """
+        Возвращает значение по ключу
+        """
+        if self._shm is None:
+            raise KeyError(key)
+        digest = self._digest(key)
+        base, lock = self._locate(digest)
+        buf = self._shm.buf
+        with lock:
+            for way in range(self.ways):
+                offset = base + way * self._slot_bytes
+                used, slot_key, _, expires, length = _HEADER.unpack_from(buf, offset)
+                if used and slot_key == digest:
+                    if expires and expires <= time():
+                        buf[offset] = 0
+                        raise KeyError(key)
+                    _HEADER.pack_into(buf, offset, True, digest, monotonic_ns(), expires, length)
+                    start = offset + _HEADER.size
+                    data = bytes(buf[start:start + length])
+                    break
+            else:
+                raise KeyError(key)
+        return self.serializer.loads(data)
+
+    def set(self, key, value, ttl=None):
+        """
+        Сохраняет значение, вытесняя самый давно использованный слот набора
+        """
+        if self._shm is None:
+            return
+        data = self.serializer.dumps(value)
+        if len(data) > self.slot_size:
+            return
+        expires = 0.0 if ttl is None else time() + ttl
+        digest = self._digest(key)
+        base, lock = self._locate(digest)
+        buf = self._shm.buf
+        with lock:
+            victim, oldest = base, None
+            for way in range(self.ways):
+                offset = base + way * self._slot_bytes
+                used, slot_key, accessed, _, _ = _HEADER.unpack_from(buf, offset)
+                if not used or slot_key == digest:
+                    victim = offset
+                    break
+                if oldest is None or accessed < oldest:
+                    victim, oldest = offset, accessed
+            start = victim + _HEADER.size
+            buf[start:start + len(data)] = data
+            _HEADER.pack_into(buf, victim, True, digest, monotonic_ns(), expires, len(data))
+
+    def clear(self):
+        """
+        Помечает все слоты свободными
+        """
+        if self._shm is None:
+            return
+        buf = self._shm.buf
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for offset in range(0, self.sets * self.ways * self._slot_bytes, self._slot_bytes):
+                buf[offset] = 0
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def close(self):
+        """
+        Отключается от разделяемой памяти. Процесс-владелец также освобождает ее
+        """
+        if self._shm is None:
+            return
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,74 @@
+"""
+Клиент для получения пользователей с общим пулом соединений.
+В отличие от get_user из main.py, который открывает новое соединение (TCP + TLS) на каждый запрос,
+клиент переиспользует соединения (keep-alive), повторяет неудачные запросы и ограничивает время ожидания.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://jsonplaceholder.typicode.com"
+
+
+class UserClient:
+    """
+    Клиент API пользователей.
+    : base_url: адрес API (для тестов - адрес из mock_server.serve_users)
+    : pool_size: максимальное количество открытых соединений с сервером
+    : retries: количество повторов при ошибке соединения или ответе 429/5xx
+    : backoff: базовая задержка между повторами, растет экспоненциально (backoff, 2 * backoff, ...)
+    : timeout: время ожидания (подключение, чтение ответа) в секундах для каждого запроса
+    """
+
+    def __init__(self, base_url=BASE_URL, *, pool_size=10, retries=3, backoff=0.1, timeout=(3.05, 10)):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        # pool_block - не открывать соединений больше pool_size, а ждать освобождения
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_user(self, user_id: int):
+        """
+        Получение одного пользователя
+        """
+        logger.info("Start get user %s", user_id)
+        response = self.session.get(f"{self.base_url}/users/{user_id}", timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+        logger.info("Got user %s", result)
+
+        return result
+
+    def get_users(self, user_ids, concurrency=None):
+        """
+        Получение нескольких пользователей параллельно
+
+        :param user_ids: идентификаторы пользователей
+        :param concurrency: количество одновременных запросов (по умолчанию равно размеру пула соединений)
+        :return: список пользователей в порядке user_ids
+        """
+        with ThreadPoolExecutor(concurrency or self.pool_size) as executor:
+            return list(executor.map(self.get_user, user_ids))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
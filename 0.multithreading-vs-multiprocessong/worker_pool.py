@@ -0,0 +1,173 @@
+"""
+Долгоживущий пул процессов.
+with multiprocessing.Pool() в demo_multiprocessing каждый раз запускает воркеры заново:
+они импортируют модули и настраивают логирование, и это стоит сотни миллисекунд на вызов.
+WarmPool запускает воркеры один раз (при первом обращении), заранее загружает в них нужное
+состояние и переиспользует их до завершения программы.
+"""
+import atexit
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+from multiprocessing import util
+
+from common import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        # сигнал 0 ничего не отправляет, только проверяет, что процесс существует
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _collect_crashed(slots):
+    """
+    Освобождает слоты воркеров, которые пропали, не освободив слот сами, и увеличивает счетчик упавших.
+    slots[0] - счетчик, остальные - pid воркеров или 0. Вызывается под slots.get_lock()
+    """
+    for index in range(1, len(slots)):
+        pid = slots[index]
+        if pid and not _pid_alive(pid):
+            logger.error("Warm pool worker %s exited unexpectedly", pid)
+            slots[index] = 0
+            slots[0] += 1
+
+
+def _release_slot(slots, pid):
+    with slots.get_lock():
+        for index in range(1, len(slots)):
+            if slots[index] == pid:
+                slots[index] = 0
+
+
+def _init_worker(initializers, slots):
+    """
+    Выполняется в каждом воркере при запуске.
+    Воркер занимает слот в slots своим pid и освобождает его при нормальном завершении
+    (например, после maxtasksperchild задач), поэтому занятый слот без живого процесса означает падение
+    """
+    pid = os.getpid()
+    with slots.get_lock():
+        # слот упавшего предшественника сначала учитывается, чтобы замена его не скрыла
+        _collect_crashed(slots)
+        for index in range(1, len(slots)):
+            if not slots[index]:
+                slots[index] = pid
+                break
+    util.Finalize(None, _release_slot, args=(slots, pid), exitpriority=0)
+    configure_logging()
+    for func, args in initializers:
+        func(*args)
+
+
+class WarmPool:
+    """
+    Ленивый пул процессов, который создается при первом вызове get() и живет до shutdown().
+    : processes: количество воркеров (по умолчанию - количество ядер)
+    : maxtasksperchild: через сколько задач воркер перезапускается, чтобы не копились утечки памяти
+    : shutdown_timeout: сколько секунд ждать завершения задач при остановке, затем воркеры завершаются принудительно
+    """
+
+    def __init__(self, processes=None, maxtasksperchild=1000, shutdown_timeout=30.0):
+        self.processes = processes
+        self.maxtasksperchild = maxtasksperchild
+        self.shutdown_timeout = shutdown_timeout
+        self._initializers = []
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def add_initializer(self, func, *args):
+        """
+        Добавляет функцию, которая выполнится в каждом воркере при запуске (в том числе после перезапуска),
+        например для загрузки справочников или моделей. Функция должна быть доступна по имени модуля
+        """
+        with self._lock:
+            if self._pool is not None:
+                raise RuntimeError("Initializers must be added before the pool is started")
+            self._initializers.append((func, args))
+
+    def get(self) -> multiprocessing.pool.Pool:
+        """
+        Возвращает пул, запуская его при первом обращении
+        """
+        with self._lock:
+            if self._pool is None:
+                # счетчик упавших воркеров и по слоту на воркер с запасом на замены,
+                # запущенные до того, как упавший воркер кто-то заметил
+                self._slots = multiprocessing.Array("q", 1 + 2 * (self.processes or os.cpu_count() or 1))
+                self._pool = multiprocessing.Pool(
+                    self.processes,
+                    initializer=_init_worker,
+                    initargs=(self._initializers, self._slots),
+                    maxtasksperchild=self.maxtasksperchild,
+                )
+                logger.info("Started warm pool")
+            return self._pool
+
+    def healthy(self) -> bool:
+        """
+        Проверяет, что пул запущен и ни один его воркер не упал.
+        Задачи в пул не отправляются, поэтому занятый долгими задачами пул считается здоровым.
+        Падение учитывается, даже если пул уже заменил воркер новым: задача упавшего воркера потеряна,
+        и пул остается нездоровым до restart()
+        """
+        with self._lock:
+            if self._pool is None:
+                return False
+            slots = self._slots
+        with slots.get_lock():
+            _collect_crashed(slots)
+            return not slots[0]
+
+    def restart(self):
+        """
+        Принудительно останавливает пул. Следующий get() запустит новый
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def ensure_healthy(self) -> multiprocessing.pool.Pool:
+        """
+        Возвращает пул, перезапустив его, если какой-то воркер упал
+        """
+        pool = self.get()
+        if not self.healthy():
+            self.restart()
+            pool = self.get()
+        return pool
+
+    def shutdown(self):
+        """
+        Останавливает пул: новые задачи не принимаются, текущие дорабатывают shutdown_timeout секунд
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        pool.close()
+        joiner = threading.Thread(target=pool.join)
+        joiner.start()
+        joiner.join(self.shutdown_timeout)
+        if joiner.is_alive():
+            logger.warning("Warm pool did not stop in %.1f s, terminating", self.shutdown_timeout)
+            pool.terminate()
+            joiner.join()
+        logger.info("Stopped warm pool")
+
+
+# общий пул приложения
+warm_pool = WarmPool()
+atexit.register(warm_pool.shutdown)
@@ -0,0 +1,72 @@
+"""
+Сравнение рекурсивного fib с кешем (functools.cache и cached из caching.py) с быстрым удвоением
+и матричным вариантом из fibonacci.py.
+Рекурсивным вариантам нужна глубина рекурсии n (cached - два кадра на уровень),
+поэтому они запускаются только до RECURSIVE_LIMIT с увеличенным лимитом рекурсии.
+fib_many считает 100 соседних значений, заканчивая n.
+Запуск: python bench_fibonacci.py
+
+Результаты:
+ fib_functools(5_000): 0.0046 s
+    fib_cached(5_000): 0.0255 s
+           fib(5_000): 0.0001 s
+           fib(1_000_000): 0.0706 s
+    fib_matrix(1_000_000): 0.3748 s
+      fib_many(1_000_000): 0.0841 s
+           fib(10_000_000): 3.8259 s
+    fib_matrix(10_000_000): 21.6408 s
+      fib_many(10_000_000): 4.3520 s
+ fib mod 1e9+7(1_000_000_000_000_000_000): 0.0001 s
+"""
+import sys
+from functools import cache
+from timeit import default_timer
+
+from caching import cached
+from fibonacci import fib, fib_many, fib_matrix
+
+RECURSIVE_LIMIT = 5_000
+
+
+@cache
+def fib_functools(n):
+    if n < 2:
+        return n
+    return fib_functools(n - 1) + fib_functools(n - 2)
+
+
+@cached(maxsize=None)
+def fib_cached(n):
+    if n < 2:
+        return n
+    return fib_cached(n - 1) + fib_cached(n - 2)
+
+
+def measure(name, func, n):
+    start_time = default_timer()
+    result = func(n)
+    print(f'{name:>14}({n:_}): {default_timer() - start_time:.4f} s')
+    return result
+
+
+def main():
+    sys.setrecursionlimit(4 * RECURSIVE_LIMIT)
+    sys.set_int_max_str_digits(0)
+
+    for n in (1_000, RECURSIVE_LIMIT):
+        fib_functools.cache_clear()
+        fib_cached.cache_clear()
+        expected = measure('fib_functools', fib_functools, n)
+        assert measure('fib_cached', fib_cached, n) == expected
+        assert measure('fib', fib, n) == expected
+
+    for n in (10 ** 5, 10 ** 6, 10 ** 7):
+        expected = measure('fib', fib, n)
+        assert measure('fib_matrix', fib_matrix, n) == expected
+        assert measure('fib_many', lambda n: fib_many(range(n - 99, n + 1))[-1], n) == expected
+
+    measure('fib mod 1e9+7', lambda n: fib(n, mod=10 ** 9 + 7), 10 ** 18)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""
+Кеширующий декоратор с ограничением размера (LRU) и временем жизни записей (TTL)
+"""
+import asyncio
+import hashlib
+import inspect
+import pickle
+import sys
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    """Статистика кеша, которую возвращает cache_info()"""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+    currbytes: int
+
+
+# разделитель между позиционными и именованными аргументами в ключе
+_KWD_MARK = (object(),)
+# типы, которые можно использовать как ключ без упаковки в кортеж
+_FAST_TYPES = {int, str}
+
+
+def make_key(args: tuple, kwargs: dict, typed: bool = False):
+    """
+    Создает хешируемый ключ кеша из аргументов вызова.
+    Порядок именованных аргументов не влияет на ключ: f(a=1, b=2) и f(b=2, a=1) совпадают.
+
+    :param args: позиционные аргументы
+    :param kwargs: именованные аргументы
+    :param typed: различать ли аргументы разных типов (1 и 1.0)
+    :return: ключ для словаря
+    """
+    key = args
+    items = ()
+    if kwargs:
+        items = tuple(sorted(kwargs.items()))
+        key += _KWD_MARK + items
+    if typed:
+        key += tuple(type(value) for value in args)
+        key += tuple(type(value) for _, value in items)
+    elif len(key) == 1 and type(key[0]) in _FAST_TYPES:
+        return key[0]
+    return key
+
+
+def make_store_key(func, args: tuple, kwargs: dict) -> bytes:
+    """
+    Создает ключ для внешнего хранилища, одинаковый во всех процессах.
+    В отличие от ключа в памяти, он включает имя функции, так как хранилище может быть общим для нескольких функций.
+
+    :param func: кешируемая функция
+    :param args: позиционные аргументы
+    :param kwargs: именованные аргументы
+    :return: хеш аргументов
+    """
+    raw = pickle.dumps(
+        (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items()))),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def cached(_func=None, *, maxsize=128, ttl=None, maxbytes=None, typed=False, sizeof=sys.getsizeof, store=None):
+    """
+    Декоратор, который генерирует кеширующий декоратор.
+    Самая давно использованная запись вытесняется за O(1), когда кеш переполнен.
+    Для корутинных функций (async def) кешируется результат await, а не объект корутины,
+    и одновременные вызовы с одинаковыми аргументами ждут одну общую задачу.
+
+    :param _func: передается позиционно, если декоратор применен без параметров
+    :param maxsize: максимальное количество записей (None - без ограничения, 0 - не кешировать)
+    :param ttl: время жизни записи в секундах (None - бессрочно)
+    :param maxbytes: максимальный суммарный размер результатов в байтах (None - без ограничения)
+    :param typed: различать ли аргументы разных типов
+    :param sizeof: функция оценки размера результата в байтах
+    :param store: второй уровень кеша, например storage.DiskStore. Любой объект, у которого
+        get(key) выбрасывает KeyError при промахе, а set(key, value) сохраняет значение.
+        Если задан ttl, он передается в хранилище: set(key, value, ttl=ttl)
+    :return: функцию из декоратора
+    """
+
+    def decorator(func):
+        """
+        Кеширует результаты вызова функции
+
+        :param func: функция, которую нужно кэшировать
+        :return: функцию из декоратора
+        """
+        # ключ -> (результат, время истечения, размер)
+        results = OrderedDict()
+        lock = Lock()
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+        def evict(key):
+            _, _, size = results.pop(key)
+            stats["bytes"] -= size
+            stats["evictions"] += 1
+
+        def lookup(key):
+            """
+            Возвращает запись из кеша или None, попутно удаляя просроченную запись
+            """
+            with lock:
+                entry = results.get(key)
+                if entry is not None:
+                    expires_at = entry[1]
+                    if expires_at is None or expires_at > monotonic():
+                        results.move_to_end(key)
+                        stats["hits"] += 1
+                        return entry
+                    evict(key)
+                stats["misses"] += 1
+                return None
+
+        def remember(key, result):
+            if maxsize == 0:
+                return
+            size = sizeof(result)
+            expires_at = None if ttl is None else monotonic() + ttl
+            with lock:
+                if key in results:
+                    stats["bytes"] -= results.pop(key)[2]
+                results[key] = (result, expires_at, size)
+                stats["bytes"] += size
+                while results and (
+                    (maxsize is not None and len(results) > maxsize)
+                    or (maxbytes is not None and stats["bytes"] > maxbytes)
+                ):
+                    # вытесняем самую старую запись - она в начале словаря
+                    evict(next(iter(results)))
+
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            """
+            Запоминает результат вызова функции и возвращает его при повторном вызове
+
+            :return: результат функции
+            """
+            key = make_key(args, kwargs, typed)
+            entry = lookup(key)
+            if entry is not None:
+                return entry[0]
+            if store is None:
+                # функция вызывается вне блокировки, чтобы рекурсия (fib) не зависала
+                result = func(*args, **kwargs)
+            else:
+                store_key = make_store_key(func, args, kwargs)
+                try:
+                    result = store.get(store_key)
+                except KeyError:
+                    result = func(*args, **kwargs)
+                    _store_set(store, store_key, result, ttl)
+            remember(key, result)
+            return result
+
+        def cache_info():
+            """
+            Возвращает статистику кеша
+            """
+            with lock:
+                return CacheInfo(
+                    stats["hits"], stats["misses"], stats["evictions"],
+                    maxsize, len(results), stats["bytes"],
+                )
+
+        def cache_clear():
+            """
+            Очищает кеш и сбрасывает статистику
+            """
+            with lock:
+                results.clear()
+                stats.update(hits=0, misses=0, evictions=0, bytes=0)
+
+        if inspect.iscoroutinefunction(func):
+            wrapped = _async_wrapper(func, make_key, lookup, remember, typed, store, ttl)
+
+        wrapped.cache_info = cache_info
+        wrapped.cache_clear = cache_clear
+        return wrapped
+
+    if _func is not None:
+        return decorator(_func)
+    return decorator
+
+
+def _store_set(store, key, value, ttl):
+    """
+    Сохраняет значение в хранилище. Без ttl вызывается set(key, value),
+    поэтому подходят и хранилища, которые не поддерживают срок жизни записей
+    """
+    if ttl is None:
+        store.set(key, value)
+    else:
+        store.set(key, value, ttl=ttl)
+
+
+def _async_wrapper(func, key_func, lookup, remember, typed, store, ttl):
+    """
+    Создает обертку для корутинной функции.
+    Пока результат вычисляется, ключ хранится в словаре in_flight вместе с задачей,
+    поэтому повторные вызовы не запускают функцию заново, а ждут ту же задачу.
+
+    :param func: корутинная функция
+    :param key_func: функция построения ключа
+    :param lookup: функция поиска в кеше
+    :param remember: функция записи в кеш
+    :param typed: различать ли аргументы разных типов
+    :param store: второй уровень кеша или None
+    :param ttl: время жизни записи в хранилище в секундах (None - бессрочно)
+    :return: корутинную функцию из декоратора
+    """
+    in_flight = {}
+
+    async def compute(key, args, kwargs):
+        try:
+            if store is None:
+                result = await func(*args, **kwargs)
+            else:
+                # хранилище работает с диском, поэтому обращения к нему не должны блокировать цикл событий
+                store_key = make_store_key(func, args, kwargs)
+                try:
+                    result = await asyncio.to_thread(store.get, store_key)
+                except KeyError:
+                    result = await func(*args, **kwargs)
+                    await asyncio.to_thread(_store_set, store, store_key, result, ttl)
+            remember(key, result)
+            return result
+        finally:
+            del in_flight[key]
+
+    @wraps(func)
+    async def wrapped(*args, **kwargs):
+        key = key_func(args, kwargs, typed)
+        entry = lookup(key)
+        if entry is not None:
+            return entry[0]
+        task = in_flight.get(key)
+        if task is None:
+            task = in_flight[key] = asyncio.ensure_future(compute(key, args, kwargs))
+        # shield - отмена одного из ожидающих не отменяет общую задачу
+        return await asyncio.shield(task)
+
+    return wrapped
@@ -0,0 +1,133 @@
+"""
+Числа Фибоначчи за O(log n) умножений.
+Рекурсивный fib из main.py с cache/cached хранит в кеше все значения до n и уходит в рекурсию на глубину n,
+поэтому уже при n порядка тысяч падает с RecursionError.
+Здесь используется быстрое удвоение:
+F(2k) = F(k) * (2 * F(k + 1) - F(k))
+F(2k + 1) = F(k) ** 2 + F(k + 1) ** 2
+Биты n обходятся от старшего к младшему в цикле, без рекурсии.
+Вместо кеша всех значений до n, как у cache/cached, хранится ограниченная таблица F(0)..F(SMALL_LIMIT):
+малые n берутся из нее, а удвоение начинается с самого длинного префикса битов n, который есть в таблице.
+С mod все вычисления идут по модулю, и числа не растут.
+"""
+
+# на сколько соседние n в fib_many могут отличаться, чтобы дойти до следующего сложениями, а не удвоением
+STEP_LIMIT = 64
+# размер таблицы малых значений, заполняемой один раз при импорте
+SMALL_LIMIT = 1024
+# префикс из стольких битов всегда есть в таблице вместе со следующим значением
+_SMALL_BITS = SMALL_LIMIT.bit_length() - 1
+
+_SMALL = [0, 1]
+for _ in range(SMALL_LIMIT - 1):
+    _SMALL.append(_SMALL[-1] + _SMALL[-2])
+
+
+def _small_pair(n, mod):
+    """
+    (F(n), F(n + 1)) из таблицы, n < SMALL_LIMIT
+    """
+    if mod is None:
+        return _SMALL[n], _SMALL[n + 1]
+    return _SMALL[n] % mod, _SMALL[n + 1] % mod
+
+
+def _double(a, b, bit, mod):
+    """
+    Из (F(k), F(k + 1)) получает (F(2k + bit), F(2k + bit + 1))
+    """
+    c = a * (2 * b - a)
+    d = a * a + b * b
+    if mod is not None:
+        c %= mod
+        d %= mod
+    if bit:
+        return d, (c + d) % mod if mod is not None else c + d
+    return c, d
+
+
+def _check(n):
+    if n < 0:
+        raise ValueError('n must be non-negative')
+
+
+def fib_pair(n: int, mod=None) -> tuple[int, int]:
+    """
+    Возвращает (F(n), F(n + 1)), по модулю mod, если он задан
+    """
+    _check(n)
+    shift = max(n.bit_length() - _SMALL_BITS, 0)
+    a, b = _small_pair(n >> shift, mod)
+    for position in range(shift - 1, -1, -1):
+        a, b = _double(a, b, (n >> position) & 1, mod)
+    if mod is not None:
+        return a % mod, b % mod
+    return a, b
+
+
+def fib(n: int, mod=None) -> int:
+    """
+    F(n) быстрым удвоением
+    """
+    return fib_pair(n, mod)[0]
+
+
+def fib_matrix(n: int, mod=None) -> int:
+    """
+    F(n) возведением матрицы [[1, 1], [1, 0]] в степень n.
+    Делает примерно вдвое больше умножений, чем fib, и оставлен для сравнения
+    """
+    _check(n)
+    # матрицы Фибоначчи симметричны, поэтому хранятся тройкой (x11, x12, x22)
+    result = (1, 0, 1)
+    power = (1, 1, 0)
+    while n:
+        if n & 1:
+            result = _multiply(result, power, mod)
+        power = _multiply(power, power, mod)
+        n >>= 1
+    return result[1]
+
+
+def _multiply(x, y, mod):
+    a, b, d = x
+    e, f, h = y
+    result = (a * e + b * f, a * f + b * h, b * f + d * h)
+    if mod is not None:
+        return tuple(value % mod for value in result)
+    return result
+
+
+def fib_many(ns, mod=None) -> list[int]:
+    """
+    Возвращает [F(n) for n in ns].
+    Значения n обрабатываются по возрастанию, и промежуточные результаты используются повторно:
+    - если n больше предыдущего не больше чем на STEP_LIMIT, до него доходят сложениями F(k + 1) = F(k) + F(k - 1);
+    - иначе считаются пары (F(m), F(m + 1)) для префиксов битов n (n >> 1, n >> 2, ...),
+      и общие префиксы разных n считаются один раз; префиксы меньше SMALL_LIMIT берутся из таблицы
+    """
+    ns = list(ns)
+    for n in ns:
+        _check(n)
+    pairs = {0: (0, 1)}
+    values = {}
+    last = 0
+    for n in sorted(set(ns)):
+        if n - last <= STEP_LIMIT:
+            a, b = pairs[last]
+            for _ in range(n - last):
+                a, b = b, (a + b) % mod if mod is not None else a + b
+        else:
+            chain = []
+            m = n
+            while m not in pairs and m >= SMALL_LIMIT:
+                chain.append(m)
+                m >>= 1
+            a, b = pairs[m] if m in pairs else _small_pair(m, mod)
+            for m in reversed(chain):
+                a, b = _double(a, b, m & 1, mod)
+                pairs[m] = a, b
+        pairs[n] = a, b
+        values[n] = a % mod if mod is not None else a
+        last = n
+    return [values[n] for n in ns]
@@ -60,6 +60,39 @@ def cached(func):
 # print(fib(55))
 # print([fib(n) for n in range(10, 20)])
 
+# 1.3. Кеш выше растет без ограничений. В caching.py - версия с вытеснением (LRU),
+# временем жизни записей (TTL), ключами из *args/**kwargs и статистикой
+# from caching import cached
+#
+#
+# @cached(maxsize=64, ttl=60)
+# def fib(n):
+#     if n < 2:
+#         return n
+#     return fib(n - 1) + fib(n - 2)
+#
+#
+# print(fib(55))
+# print(fib.cache_info())  # CacheInfo(hits=53, misses=56, evictions=0, maxsize=64, currsize=56, currbytes=...)
+# fib.cache_clear()
+
+# 1.4. Второй уровень кеша на диске (storage.py) - результаты переживают перезапуск
+# и доступны всем процессам на машине
+# from storage import DiskStore
+#
+#
+# @cached(maxsize=64, store=DiskStore("fib.sqlite3", max_entries=10_000))
+# def fib(n):
+#     ...
+
+# 1.5. Кеш спасает от экспоненциального времени, но не от глубины рекурсии n и памяти под n значений.
+# В fibonacci.py - быстрое удвоение за O(log n) умножений без рекурсии и кеша (сравнение - bench_fibonacci.py)
+# from fibonacci import fib, fib_many
+#
+# print(fib(10_000_000).bit_length())
+# print(fib(10 ** 18, mod=10 ** 9 + 7))
+# print(fib_many([10, 20, 30]))  # [55, 6765, 832040]
+
 """
 Декоратор, который покажет в каком порядке разворачиваются несколько декораторов
 trace() показывает какие вызовы были сделаны над этой функцией
@@ -143,6 +176,10 @@ cache кэширует результаты, но это не влияет на
 Резюме:
 Если нужно увидеть все вызовы функции, включая повторные, то применяется trace до cache.
 Если нужно увидеть только уникальные вызовы, то применяется cache до trace.
+
+trace печатает две строки на каждый вызов, и для горячих функций вроде fib печать занимает
+больше времени, чем сами вычисления. В tracing.py - вариант, который пишет события в кольцевой
+буфер, включается и выключается на лету и выгружает результат в формат Chrome trace / speedscope.
 """
 
 
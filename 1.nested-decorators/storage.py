@@ -0,0 +1,144 @@
+"""
+Дисковое хранилище для второго уровня кеша (см. caching.cached(store=...)).
+Данные лежат в файле SQLite, поэтому переживают перезапуск и доступны
+всем процессам на одной машине, например воркерам multiprocessing.Pool.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+from time import time
+
+
+class DiskStore:
+    """
+    Хранилище "ключ - значение" в файле SQLite с вытеснением давно не использованных записей.
+    Интерфейс как у словаря: get(key) выбрасывает KeyError, если ключа нет или запись просрочена,
+    set(key, value, ttl=None) сохраняет значение (на ttl секунд, None - бессрочно).
+    Ключи - bytes, их создает caching.make_store_key.
+    : path: путь к файлу базы
+    : serializer: объект с методами dumps/loads (pickle, json, marshal)
+    : max_entries: максимальное количество записей (None - без ограничения)
+    : max_bytes: максимальный суммарный размер значений в байтах (None - без ограничения)
+    : timeout: сколько секунд ждать, пока другой процесс держит блокировку файла
+    """
+
+    def __init__(self, path, *, serializer=pickle, max_entries=None, max_bytes=None, timeout=30.0):
+        self.path = os.fspath(path)
+        self.serializer = serializer
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key BLOB PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " expires REAL)"
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(cache)")}
+        if "expires" not in columns:
+            # файл, созданный версией без срока жизни записей
+            connection.execute("ALTER TABLE cache ADD COLUMN expires REAL")
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    def _connect(self):
+        """
+        Возвращает соединение текущего потока.
+        Соединения SQLite нельзя передавать между потоками и в дочерние процессы,
+        поэтому после fork соединение создается заново.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        """
+        Возвращает значение по ключу и отмечает время обращения к нему.
+        Просроченная запись удаляется и считается промахом
+        """
+        connection = self._connect()
+        row = connection.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        now = time()
+        value, expires = row
+        if expires is not None and expires <= now:
+            connection.execute("DELETE FROM cache WHERE key = ? AND expires <= ?", (key, now))
+            raise KeyError(key)
+        connection.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return self.serializer.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """
+        Сохраняет значение и вытесняет самые давно использованные записи, если превышены лимиты.
+        Время истечения хранится как время по часам системы, поэтому оно одинаково для всех процессов
+        и после перезапуска
+        """
+        data = self.serializer.dumps(value)
+        if isinstance(data, str):
+            data = data.encode()
+        now = time()
+        expires = None if ttl is None else now + ttl
+        connection = self._connect()
+        # BEGIN IMMEDIATE сразу берет блокировку на запись, чтобы процессы не вытесняли записи одновременно
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, accessed, expires) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, expires),
+            )
+            self._evict(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _evict(self, connection):
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        count, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if self.max_entries is not None and count > self.max_entries:
+            excess = count - self.max_entries
+            connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if self.max_bytes is not None and total > self.max_bytes:
+            # удаляем самые старые записи, пока суммарный размер не уложится в лимит
+            rows = connection.execute("SELECT key, size FROM cache ORDER BY accessed")
+            victims = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                total -= size
+            connection.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+    def clear(self):
+        """
+        Удаляет все записи
+        """
+        self._connect().execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        """
+        Закрывает соединение текущего потока
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
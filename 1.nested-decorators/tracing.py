@@ -0,0 +1,224 @@
+"""
+Трассировка вызовов без print: события пишутся в кольцевой буфер фиксированного размера,
+а после работы программы выгружаются в формат Chrome trace (chrome://tracing, Perfetto) или speedscope.
+
+Пока трассировка выключена, обертка стоит одну проверку флага, поэтому декоратор
+можно оставлять в рабочем коде и включать только при необходимости:
+
+@trace
+def fib(n):
+    ...
+
+
+enable()
+fib(20)
+disable()
+export_chrome_trace("fib.trace.json")
+"""
+import json
+import os
+import threading
+from array import array
+from functools import wraps
+from time import perf_counter_ns
+
+# глобальный выключатель трассировки
+_enabled = False
+# глубина вложенности вызовов отдельно для каждого потока
+_local = threading.local()
+
+
+def enable():
+    """
+    Включает запись событий
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    Выключает запись событий
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+class RingBuffer:
+    """
+    Кольцевой буфер событий трассировки.
+    Память выделяется один раз при создании. Когда буфер заполнен, новые события
+    перезаписывают самые старые.
+    : capacity: максимальное количество хранимых событий
+    """
+
+    def __init__(self, capacity=65_536):
+        self.capacity = capacity
+        self.names = [""] * capacity
+        self.depths = array("i", [0]) * capacity
+        self.arg_hashes = array("q", [0]) * capacity
+        self.thread_ids = array("Q", [0]) * capacity
+        self.starts = array("q", [0]) * capacity
+        self.ends = array("q", [0]) * capacity
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, depth, arg_hash, thread_id, start, end):
+        """
+        Записывает завершенный вызов функции
+        """
+        with self._lock:
+            index = self.total % self.capacity
+            self.total += 1
+        self.names[index] = name
+        self.depths[index] = depth
+        self.arg_hashes[index] = arg_hash
+        self.thread_ids[index] = thread_id
+        self.starts[index] = start
+        self.ends[index] = end
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def __iter__(self):
+        """
+        Возвращает события от самого старого к самому новому:
+        (имя функции, глубина, хеш аргументов, id потока, начало и конец в наносекундах)
+        """
+        first = max(self.total - self.capacity, 0)
+        for position in range(first, self.total):
+            index = position % self.capacity
+            yield (
+                self.names[index], self.depths[index], self.arg_hashes[index],
+                self.thread_ids[index], self.starts[index], self.ends[index],
+            )
+
+    def clear(self):
+        self.total = 0
+
+
+# буфер по умолчанию для всех декорированных функций
+buffer = RingBuffer()
+
+
+def _hash_args(a, kw):
+    try:
+        return hash((a, frozenset(kw.items()))) if kw else hash(a)
+    except TypeError:
+        # нехешируемые аргументы (списки, словари) различаем хотя бы по идентичности
+        return id(a)
+
+
+def trace(_func=None, *, ring=None):
+    """
+    Декоратор, который генерирует декоратор для записи вызовов в кольцевой буфер
+
+    :param _func: передается позиционно
+    :param ring: буфер для событий (по умолчанию общий tracing.buffer)
+    :return: функцию из декоратора
+    """
+
+    def decorator(func):
+        """
+        Декоратор для отслеживания вызовов функции
+
+        :param func: функция, которую нужно отслеживать
+        :return: функцию из декоратора
+        """
+        name = func.__qualname__
+        # не ring or buffer: у RingBuffer есть __len__, и пустой буфер считается ложным
+        target = buffer if ring is None else ring
+
+        @wraps(func)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return func(*a, **kw)
+
+            depth = getattr(_local, "depth", 0)
+            _local.depth = depth + 1
+            start = perf_counter_ns()
+            try:
+                return func(*a, **kw)
+            finally:
+                end = perf_counter_ns()
+                _local.depth = depth
+                target.record(name, depth, _hash_args(a, kw), threading.get_ident(), start, end)
+
+        return wrapper
+
+    if _func is not None:
+        return decorator(_func)
+    return decorator
+
+
+def export_chrome_trace(path, ring=None):
+    """
+    Сохраняет события в формате Chrome trace (JSON с массивом traceEvents).
+    Файл открывается в chrome://tracing или https://ui.perfetto.dev
+
+    :param path: путь к файлу
+    :param ring: буфер с событиями (по умолчанию общий tracing.buffer)
+    """
+    pid = os.getpid()
+    ring = buffer if ring is None else ring
+    events = [
+        {
+            "name": name,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": pid,
+            "tid": thread_id,
+            "args": {"depth": depth, "args_hash": arg_hash},
+        }
+        for name, depth, arg_hash, thread_id, start, end in ring
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ns"}, file)
+
+
+def export_speedscope(path, ring=None):
+    """
+    Сохраняет события в формате speedscope (https://www.speedscope.app), по профилю на поток
+
+    :param path: путь к файлу
+    :param ring: буфер с событиями (по умолчанию общий tracing.buffer)
+    """
+    ring = buffer if ring is None else ring
+    frames = []
+    frame_index = {}
+    threads = {}
+
+    for name, depth, _, thread_id, start, end in ring:
+        if name not in frame_index:
+            frame_index[name] = len(frames)
+            frames.append({"name": name})
+        frame = frame_index[name]
+        events = threads.setdefault(thread_id, [])
+        # при равном времени сначала закрываются вложенные вызовы, затем открываются новые
+        events.append((start, 1, depth, "O", frame))
+        events.append((end, 0, -depth, "C", frame))
+
+    profiles = []
+    for thread_id, events in threads.items():
+        events.sort()
+        profiles.append({
+            "type": "evented",
+            "name": f"thread {thread_id}",
+            "unit": "nanoseconds",
+            "startValue": events[0][0],
+            "endValue": events[-1][0],
+            "events": [{"type": kind, "frame": frame, "at": at} for at, _, _, kind, frame in events],
+        })
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "exporter": "tracing.py",
+        }, file)
@@ -0,0 +1,191 @@
+"""
+Классы-декораторы для кеширования, в том числе для многопоточного использования
+"""
+import asyncio
+import hashlib
+import inspect
+import pickle
+from concurrent.futures import Future
+from functools import update_wrapper
+from threading import Lock, get_ident
+
+# разделитель между позиционными и именованными аргументами в ключе
+_KWD_MARK = (object(),)
+
+
+class Cached:
+    """
+    Класс-декоратор с кешем результатов.
+    В отличие от примера в main.py учитывает именованные аргументы и умеет очищать кеш.
+    Если декорируется корутинная функция (async def), создается AsyncCached.
+    : store: второй уровень кеша, общий для процессов (например DiskStore из 1.nested-decorators/storage.py).
+        Любой объект, у которого get(key) выбрасывает KeyError при промахе, а set(key, value) сохраняет значение.
+        Записи с истекшим сроком жизни (например, сохраненные cached(ttl=...) в общий DiskStore)
+        хранилище возвращает как промах, и результат вычисляется заново
+    """
+
+    def __new__(cls, function, *args, **kwargs):
+        if cls is Cached and inspect.iscoroutinefunction(function):
+            cls = AsyncCached
+        return super().__new__(cls)
+
+    def __init__(self, function, *, store=None):
+        self.function = function
+        self.store = store
+        self._cache = {}
+        update_wrapper(self, function)
+
+    @staticmethod
+    def make_key(args, kwargs):
+        """
+        Создает хешируемый ключ кеша из аргументов вызова
+        """
+        if not kwargs:
+            return args
+        return args + _KWD_MARK + tuple(sorted(kwargs.items()))
+
+    def make_store_key(self, args, kwargs):
+        """
+        Создает ключ для хранилища, одинаковый во всех процессах
+        """
+        raw = pickle.dumps(
+            (self.function.__module__, self.function.__qualname__, args, tuple(sorted(kwargs.items()))),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def _load(self, args, kwargs):
+        """
+        Берет результат из хранилища или вычисляет его и сохраняет в хранилище
+        """
+        if self.store is None:
+            return self.function(*args, **kwargs)
+        store_key = self.make_store_key(args, kwargs)
+        try:
+            return self.store.get(store_key)
+        except KeyError:
+            pass
+        result = self.function(*args, **kwargs)
+        self.store.set(store_key, result)
+        return result
+
+    def __call__(self, *args, **kwargs):
+        key = self.make_key(args, kwargs)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        result = self._cache[key] = self._load(args, kwargs)
+        return result
+
+    def cache_clear(self):
+        """
+        Очищает кеш
+        """
+        self._cache.clear()
+
+
+class ConcurrentCached(Cached):
+    """
+    Потокобезопасный класс-декоратор с защитой от "лавины" (cache stampede).
+    Если несколько потоков одновременно промахиваются по одному ключу, функцию вычисляет
+    только первый из них, остальные ждут его Future и получают тот же результат (или исключение).
+    Ключи распределены по shards блокировкам, поэтому потоки с разными ключами почти не конкурируют.
+    Параметры задаются при явном создании: ConcurrentCached(func, shards=64)
+    или через functools.partial(ConcurrentCached, shards=64).
+    """
+
+    def __init__(self, function, *, shards=16, store=None):
+        super().__init__(function, store=store)
+        # у каждого шарда своя блокировка и свой словарь вычисляемых сейчас ключей
+        self._shards = [(Lock(), {}) for _ in range(shards)]
+
+    def __call__(self, *args, **kwargs):
+        key = self.make_key(args, kwargs)
+        # быстрый путь без блокировки: чтение из dict атомарно
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        lock, in_flight = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            if key in self._cache:
+                return self._cache[key]
+            pending = in_flight.get(key)
+            if pending is None:
+                future = Future()
+                in_flight[key] = (future, get_ident())
+
+        if pending is not None:
+            future, owner = pending
+            if owner == get_ident():
+                raise RuntimeError(f"Recursive call of {self.function.__name__} with the same arguments {key!r}")
+            return future.result()
+
+        try:
+            result = self._load(args, kwargs)
+        except BaseException as exc:
+            with lock:
+                del in_flight[key]
+            future.set_exception(exc)
+            raise
+
+        with lock:
+            self._cache[key] = result
+            del in_flight[key]
+        future.set_result(result)
+        return result
+
+    def cache_clear(self):
+        """
+        Очищает кеш. Вычисления, которые идут в этот момент, завершатся и запишут свой результат
+        """
+        for lock, _ in self._shards:
+            lock.acquire()
+        try:
+            super().cache_clear()
+        finally:
+            for lock, _ in self._shards:
+                lock.release()
+
+
+class AsyncCached(Cached):
+    """
+    Класс-декоратор для корутинных функций.
+    Кеширует результат await. Одновременные вызовы с одинаковыми аргументами
+    ждут одну общую задачу, поэтому корутина выполняется один раз.
+    """
+
+    def __init__(self, function, *, store=None):
+        super().__init__(function, store=store)
+        self._in_flight = {}
+
+    async def __call__(self, *args, **kwargs):
+        key = self.make_key(args, kwargs)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._compute(key, args, kwargs))
+        # shield - отмена одного из ожидающих не отменяет общую задачу
+        return await asyncio.shield(task)
+
+    async def _compute(self, key, args, kwargs):
+        try:
+            if self.store is None:
+                result = await self.function(*args, **kwargs)
+            else:
+                # хранилище работает с диском, поэтому обращения к нему не должны блокировать цикл событий
+                store_key = self.make_store_key(args, kwargs)
+                try:
+                    result = await asyncio.to_thread(self.store.get, store_key)
+                except KeyError:
+                    result = await self.function(*args, **kwargs)
+                    await asyncio.to_thread(self.store.set, store_key, result)
+            self._cache[key] = result
+            return result
+        finally:
+            del self._in_flight[key]
@@ -0,0 +1,137 @@
+"""
+Двоичная сериализация датаклассов со слотами (например, User) без pickle.
+Формат записи строится по полям датакласса один раз:
+числа и bool упаковываются struct фиксированной ширины, строки и bytes - длиной в заголовке и данными после него.
+Пачка записей - число записей (4 байта) и записи подряд.
+
+codec = StructCodec(User)
+data = codec.encode_many(users)  # bytearray, можно передать в Pool или записать на диск
+users = codec.decode_many(data)
+"""
+import dataclasses
+import operator
+import struct
+import typing
+
+_FORMATS = {int: "q", float: "d", bool: "?"}
+_COUNT = struct.Struct("<I")
+
+
+class StructCodec:
+    """
+    Кодек для датакласса cls. Поддерживаются поля типов int, float, bool, str и bytes.
+    Все поля должны передаваться в __init__ (init=True), поля kw_only передаются по имени.
+    Декодирование читает поля прямо из memoryview исходного буфера, без промежуточных копий.
+    """
+
+    def __init__(self, cls):
+        if not dataclasses.is_dataclass(cls):
+            raise TypeError(f"{cls!r} is not a dataclass")
+        hints = typing.get_type_hints(cls)
+        fields = dataclasses.fields(cls)
+        fmt = "<"
+        self._variable = []  # (номер поля, тип) для полей переменной длины
+        for index, field in enumerate(fields):
+            if not field.init:
+                # значение такого поля нельзя передать в конструктор при декодировании
+                raise TypeError(f"Field {field.name!r} has init=False and cannot be decoded")
+            field_type = hints[field.name]
+            if field_type in _FORMATS:
+                fmt += _FORMATS[field_type]
+            elif field_type in (str, bytes):
+                fmt += "I"
+                self._variable.append((index, field_type))
+            else:
+                raise TypeError(f"Unsupported type {field_type!r} of field {field.name!r}")
+
+        self.cls = cls
+        self._header = struct.Struct(fmt)
+        names = [field.name for field in fields]
+        if any(field.kw_only is True for field in fields):
+            # поля kw_only нельзя передать позиционно, поэтому все значения передаются по именам
+            self._make = lambda *values: cls(**dict(zip(names, values)))
+        else:
+            self._make = cls
+        self._getter = operator.attrgetter(*names)
+        # attrgetter с одним именем возвращает значение, а не кортеж
+        self._single = len(names) == 1
+
+    def _encode_into(self, out: bytearray, obj):
+        values = self._getter(obj)
+        if self._single:
+            values = (values,)
+        if not self._variable:
+            out += self._header.pack(*values)
+            return
+        values = list(values)
+        chunks = []
+        for index, field_type in self._variable:
+            data = values[index].encode() if field_type is str else values[index]
+            values[index] = len(data)
+            chunks.append(data)
+        out += self._header.pack(*values)
+        out += b"".join(chunks)
+
+    def _decode_from(self, view: memoryview, offset: int):
+        """
+        Возвращает объект и смещение следующей записи
+        """
+        values = self._header.unpack_from(view, offset)
+        offset += self._header.size
+        if self._variable:
+            values = list(values)
+            for index, field_type in self._variable:
+                end = offset + values[index]
+                chunk = view[offset:end]
+                values[index] = str(chunk, "utf-8") if field_type is str else bytes(chunk)
+                offset = end
+        return self._make(*values), offset
+
+    def encode(self, obj) -> bytearray:
+        """
+        Кодирует один объект
+        """
+        out = bytearray()
+        self._encode_into(out, obj)
+        return out
+
+    def decode(self, buffer):
+        """
+        Декодирует один объект из bytes, bytearray или memoryview
+        """
+        return self._decode_from(memoryview(buffer), 0)[0]
+
+    def encode_many(self, objects) -> bytearray:
+        """
+        Кодирует пачку объектов в один буфер
+        """
+        out = bytearray(_COUNT.size)
+        count = 0
+        for obj in objects:
+            self._encode_into(out, obj)
+            count += 1
+        _COUNT.pack_into(out, 0, count)
+        return out
+
+    def iter_decode(self, buffer):
+        """
+        Лениво декодирует пачку объектов, созданную encode_many
+        """
+        with memoryview(buffer) as view:
+            (count,) = _COUNT.unpack_from(view, 0)
+            offset = _COUNT.size
+            if not self._variable:
+                # все записи одной длины - разбор целиком на C
+                end = offset + count * self._header.size
+                for values in self._header.iter_unpack(view[offset:end]):
+                    yield self._make(*values)
+                return
+            for _ in range(count):
+                obj, offset = self._decode_from(view, offset)
+                yield obj
+
+    def decode_many(self, buffer) -> list:
+        """
+        Декодирует пачку объектов, созданную encode_many
+        """
+        return list(self.iter_decode(buffer))
@@ -0,0 +1,508 @@
+"""
+History для горячих функций.
+Здесь результаты хранятся в кольцевом буфере фиксированного размера (для чисел - в array),
+а среднее, минимум, максимум и квантили последних total_items результатов обновляются при каждом вызове за O(1),
+без обхода истории.
+
+@History(total_items=100_000, typecode="d", stats=True)
+def handle(request):
+    ...
+
+handle.history.summary()  # {'count': ..., 'mean': ..., 'min': ..., 'max': ..., 'p50': ..., 'p99': ...}
+
+ConcurrentHistory можно вызывать из нескольких потоков и собирать в одну историю результаты из процессов Pool:
+
+queue = multiprocessing.Queue()
+with handle.history.collecting(queue):
+    with multiprocessing.Pool(initializer=share_history, initargs=(queue, handle)) as pool:
+        pool.map(handle, requests)
+        pool.close()
+        pool.join()  # воркеры отправляют остаток записей при нормальном завершении
+"""
+import heapq
+import inspect
+import itertools
+import math
+import os
+import threading
+import time
+import weakref
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from multiprocessing import util
+
+_MISSING = object()
+
+
+class RingBuffer:
+    """
+    Кольцевой буфер на capacity элементов: новый элемент записывается на место самого старого.
+    : typecode: код типа array ('d', 'q' и т.д.) для чисел, None - список для любых объектов
+    """
+
+    def __init__(self, capacity: int, typecode=None):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.typecode = typecode
+        self._items = array(typecode, [0]) * capacity if typecode else [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, item):
+        """
+        Добавляет элемент и возвращает вытесненный или _MISSING, если буфер еще не заполнен
+        """
+        if self._size < self.capacity:
+            self._items[(self._start + self._size) % self.capacity] = item
+            self._size += 1
+            return _MISSING
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def newest(self):
+        """
+        Последний добавленный элемент в том виде, в каком он хранится (для array - после приведения к typecode)
+        """
+        if not self._size:
+            raise IndexError("buffer is empty")
+        return self._items[(self._start + self._size - 1) % self.capacity]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """
+        Элементы от старого к новому
+        """
+        items, start, capacity = self._items, self._start, self.capacity
+        for i in range(self._size):
+            yield items[(start + i) % capacity]
+
+    def to_list(self) -> list:
+        end = self._start + self._size
+        if end <= self.capacity:
+            return list(self._items[self._start:end])
+        return list(self._items[self._start:]) + list(self._items[:end - self.capacity])
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+
+class QuantileSketch:
+    """
+    Приближенные квантили с относительной погрешностью relative_accuracy.
+    Значения раскладываются по логарифмическим корзинам: |x| попадает в корзину k, если gamma ** (k - 1) < |x| <= gamma ** k.
+    Корзин немного (около 2000 на диапазон от 1e-9 до 1e9 при погрешности 1%), и значения можно удалять,
+    поэтому скетч подходит для скользящего окна.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+        self.count = 0
+
+    def _bucket(self, value):
+        if abs(value) < 1e-9:
+            return None, 0
+        return (self._positive if value > 0 else self._negative), math.ceil(math.log(abs(value)) / self._log_gamma)
+
+    def add(self, value):
+        buckets, key = self._bucket(value)
+        if buckets is None:
+            self._zeros += 1
+        else:
+            buckets[key] = buckets.get(key, 0) + 1
+        self.count += 1
+
+    def remove(self, value):
+        buckets, key = self._bucket(value)
+        if buckets is None:
+            self._zeros -= 1
+        elif buckets[key] == 1:
+            del buckets[key]
+        else:
+            buckets[key] -= 1
+        self.count -= 1
+
+    def _value(self, key):
+        # середина корзины, ошибка не больше relative_accuracy
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float):
+        """
+        Возвращает приближенное значение квантиля q (от 0 до 1) или None, если значений нет
+        """
+        if not self.count:
+            return None
+        # номер значения (с 1) в отсортированном порядке: квантиль q - наименьшее значение,
+        # не меньше которого доля q всех значений
+        rank = min(max(math.ceil(q * self.count), 1), self.count)
+        seen = 0
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen >= rank:
+                return -self._value(key)
+        seen += self._zeros
+        if seen >= rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen >= rank:
+                return self._value(key)
+        return self._value(max(self._positive))
+
+    def clear(self):
+        self._positive.clear()
+        self._negative.clear()
+        self._zeros = 0
+        self.count = 0
+
+
+class WindowStats:
+    """
+    Статистика последних window числовых значений.
+    Сумма и скетч обновляются добавлением нового и удалением вытесненного значения,
+    минимум и максимум - через монотонные очереди (амортизированно O(1)).
+    """
+
+    def __init__(self, window: int, relative_accuracy=0.01):
+        self.window = window
+        self.sketch = QuantileSketch(relative_accuracy)
+        self._sum = 0
+        self._added = 0
+        self._min = deque()  # (номер, значение), значения возрастают
+        self._max = deque()  # (номер, значение), значения убывают
+
+    def update(self, value, evicted=_MISSING):
+        """
+        Учитывает новое значение и значение evicted, вытесненное им из окна
+        """
+        index = self._added
+        self._added += 1
+        self._sum += value
+        self.sketch.add(value)
+        if evicted is not _MISSING:
+            self._sum -= evicted
+            self.sketch.remove(evicted)
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        oldest = index - self.window
+        if self._min[0][0] <= oldest:
+            self._min.popleft()
+        if self._max[0][0] <= oldest:
+            self._max.popleft()
+
+    @property
+    def count(self) -> int:
+        return self.sketch.count
+
+    @property
+    def mean(self):
+        return self._sum / self.count if self.count else None
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    def quantile(self, q: float):
+        value = self.sketch.quantile(q)
+        if value is None:
+            return None
+        # середина корзины может выйти за границы окна
+        return min(max(value, self.min), self.max)
+
+    def clear(self):
+        self.sketch.clear()
+        self._sum = 0
+        self._added = 0
+        self._min.clear()
+        self._max.clear()
+
+
+class History:
+    """
+    Класс-декоратор для хранения последних результатов функции, совместимый с History из main.py.
+    : total_items: максимальное количество сохраняемых результатов
+    : typecode: код типа array для числовых результатов (экономит память), None - любые объекты
+    : stats: считать ли статистику результатов (результаты должны быть числами)
+    : relative_accuracy: относительная погрешность квантилей
+    """
+
+    def __init__(self, total_items=10, *, typecode=None, stats=False, relative_accuracy=0.01):
+        self.total_items = total_items
+        self._buffer = RingBuffer(total_items, typecode)
+        self.stats = WindowStats(total_items, relative_accuracy) if stats else None
+        self.func = None
+
+    @property
+    def results_history(self) -> list:
+        """
+        Результаты от старого к новому
+        """
+        return self._buffer.to_list()
+
+    def add_history_item(self, result):
+        """
+        Добавляет результат, вытесняя самый старый, если история заполнена
+        """
+        evicted = self._buffer.append(result)
+        if self.stats is not None:
+            # в статистику идет сохраненное значение: вытесненное тоже читается из буфера,
+            # и при приведении к typecode (например, 'f') оно может попасть в другую корзину скетча
+            self.stats.update(self._buffer.newest(), evicted)
+
+    def _window_stats(self) -> WindowStats:
+        if self.stats is None:
+            raise RuntimeError("History was created with stats=False")
+        return self.stats
+
+    def summary(self) -> dict:
+        """
+        Возвращает статистику последних результатов
+        """
+        stats = self._window_stats()
+        return {
+            "count": stats.count,
+            "mean": stats.mean,
+            "min": stats.min,
+            "max": stats.max,
+            "p50": stats.quantile(0.5),
+            "p90": stats.quantile(0.9),
+            "p99": stats.quantile(0.99),
+        }
+
+    def clear(self):
+        self._buffer.clear()
+        if self.stats is not None:
+            self.stats.clear()
+
+    def wrap(self, func):
+        """
+        Возвращает обертку над func, которая добавляет каждый результат в историю
+        """
+        self.func = func
+        func.history = self
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await func(*args, **kwargs)
+                self.add_history_item(result)
+
+                return result
+
+            async_wrapper.history = self
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            self.add_history_item(result)
+
+            return result
+
+        wrapper.history = self
+        return wrapper
+
+    def __call__(self, func):
+        return self.wrap(func)
+
+
+def _entry_key(entry):
+    # (время, номер) - порядок вызовов; сами результаты могут быть несравнимыми
+    return entry[0], entry[1]
+
+
+class _ThreadState:
+    """
+    Записи одного потока ConcurrentHistory: очередь последних записей,
+    записи, еще не отправленные в очередь share(), и время последней отправки
+    """
+    __slots__ = ("buffer", "outbox", "last_flush", "__weakref__")
+
+    def __init__(self, total_items):
+        self.buffer = deque(maxlen=total_items)
+        self.outbox = []
+        self.last_flush = time.monotonic()
+
+
+def _retire_thread(history_ref, buffer, outbox):
+    # вызывается, когда состояние завершившегося потока удаляется из threading.local
+    history = history_ref()
+    if history is not None:
+        history._retire(buffer, outbox)
+
+
+class ConcurrentHistory(History):
+    """
+    История, которую можно пополнять из нескольких потоков и процессов.
+    Каждый поток пишет в свою очередь без блокировок, записи помечаются временем и номером вызова,
+    а при чтении очереди всех потоков и истории, полученные из других процессов, сливаются по времени.
+    Статистика считается при чтении по объединенной истории.
+    : batch_size: сколько записей процесс-воркер копит перед отправкой в очередь share()
+    : flush_interval: через сколько секунд воркер отправляет накопленные записи, даже если пачка не заполнена
+    """
+
+    def __init__(self, total_items=10, *, stats=False, relative_accuracy=0.01, batch_size=1000, flush_interval=1.0):
+        self.total_items = total_items
+        self.stats = None
+        self.func = None
+        self._stats_enabled = stats
+        self.relative_accuracy = relative_accuracy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._counter = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buffers = []  # очереди всех потоков
+        self._outboxes = []  # записи потоков, еще не отправленные в очередь share()
+        self._remote = []  # записи из других процессов и завершившихся потоков, отсортированы по времени
+        self._queue = None
+
+    def _thread_state(self) -> _ThreadState:
+        try:
+            return self._local.state
+        except AttributeError:
+            state = self._local.state = _ThreadState(self.total_items)
+            with self._lock:
+                self._buffers.append(state.buffer)
+                self._outboxes.append(state.outbox)
+            # после завершения потока его записи переносятся в _remote, чтобы очереди потоков не копились
+            weakref.finalize(state, _retire_thread, weakref.ref(self), state.buffer, state.outbox)
+            return state
+
+    def _retire(self, buffer, outbox):
+        """
+        Убирает очереди завершившегося потока, перенося его последние записи в общую историю
+        """
+        if self._queue is not None:
+            self._send(outbox)
+        with self._lock:
+            self._buffers = [item for item in self._buffers if item is not buffer]
+            self._outboxes = [item for item in self._outboxes if item is not outbox]
+            self._merge(buffer)
+
+    def add_history_item(self, result):
+        state = self._thread_state()
+        entry = (time.time_ns(), next(self._counter), result)
+        state.buffer.append(entry)
+        if self._queue is not None:
+            state.outbox.append(entry)
+            now = time.monotonic()
+            if len(state.outbox) >= self.batch_size or now - state.last_flush >= self.flush_interval:
+                self._send(state.outbox)
+                state.last_flush = now
+
+    def _entries(self) -> list:
+        with self._lock:
+            # list() копирует очередь одной операцией на C, поток-владелец не изменит ее посередине
+            sources = [list(buffer) for buffer in self._buffers]
+            sources.append(self._remote)
+        return list(deque(heapq.merge(*sources, key=_entry_key), maxlen=self.total_items))
+
+    @property
+    def results_history(self) -> list:
+        return [entry[2] for entry in self._entries()]
+
+    def _window_stats(self) -> WindowStats:
+        if not self._stats_enabled:
+            raise RuntimeError("History was created with stats=False")
+        stats = WindowStats(self.total_items, self.relative_accuracy)
+        for entry in self._entries():
+            stats.update(entry[2])
+        return stats
+
+    def clear(self):
+        with self._lock:
+            for buffer in self._buffers:
+                buffer.clear()
+            self._remote = []
+
+    def share(self, queue):
+        """
+        Включает отправку новых записей в multiprocessing.Queue пачками. Вызывается в процессе-воркере
+        """
+        self._queue = queue
+        self._pid = os.getpid()
+        # блокировка могла быть захвачена другим потоком родителя в момент fork
+        self._lock = threading.Lock()
+        # выше, чем у закрытия самой multiprocessing.Queue (10): иначе поток очереди
+        # завершится раньше, чем в канал попадут последние записи
+        util.Finalize(self, self.flush, exitpriority=20)
+
+    def _send(self, outbox):
+        batch = outbox[:]
+        if batch:
+            # удаляется только отправленное: поток-владелец мог успеть добавить новые записи
+            del outbox[:len(batch)]
+            self._queue.put((self._pid, batch))
+
+    def flush(self):
+        """
+        Отправляет накопленные записи всех потоков в очередь share().
+        Вызывается автоматически при нормальном завершении воркера
+        """
+        if self._queue is None:
+            return
+        with self._lock:
+            outboxes = list(self._outboxes)
+        for outbox in outboxes:
+            self._send(outbox)
+
+    def merge(self, entries):
+        """
+        Добавляет записи, полученные из другого процесса
+        """
+        with self._lock:
+            self._merge(entries)
+
+    def _merge(self, entries):
+        merged = heapq.merge(self._remote, sorted(entries, key=_entry_key), key=_entry_key)
+        self._remote = list(deque(merged, maxlen=self.total_items))
+
+    def _collect(self, queue):
+        while (batch := queue.get()) is not None:
+            self.merge(batch[1])
+
+    @contextmanager
+    def collecting(self, queue):
+        """
+        Пока открыт контекст, фоновый поток забирает из queue пачки записей от воркеров и добавляет их в историю.
+        Забирать записи нужно во время работы пула: воркер с неотправленными в канал данными очереди
+        не завершится, и pool.join() зависнет
+        """
+        thread = threading.Thread(target=self._collect, args=(queue,), daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            queue.put(None)
+            thread.join()
+
+
+def share_history(queue, *functions):
+    """
+    Инициализатор воркеров Pool: результаты функций functions, обернутых ConcurrentHistory,
+    будут отправляться в queue, откуда родитель забирает их через history.collecting(queue)
+    """
+    for func in functions:
+        func.history.share(queue)
@@ -0,0 +1,179 @@
+"""
+Регистр моделей с ленивой загрузкой и индексами.
+ModelsRegistry из main.py требует импортировать каждую модель заранее, чтобы сработал декоратор,
+и при сотнях моделей запуск программы тратит время на импорт моделей, которые не понадобятся.
+Здесь модель можно зарегистрировать строкой "пакет.модуль:Класс" - модуль импортируется при первом обращении.
+
+models = ModelsRegistry()
+models.register_lazy("blog.models:Post", tags=("blog",))
+
+@models.register(tags=("crm",))
+class Client:
+    pass
+
+models["Post"]  # здесь импортируется blog.models
+models.by_tag("crm")  # (Client,)
+snapshot = models.freeze()  # неизменяемые словари для горячего пути
+snapshot.models["Client"]
+"""
+import importlib
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+class RegistrySnapshot(NamedTuple):
+    """
+    Неизменяемый снимок регистра с заранее построенными индексами
+    """
+    models: MappingProxyType  # имя -> класс
+    by_tag: MappingProxyType  # тег -> кортеж классов
+    by_base: MappingProxyType  # базовый класс -> кортеж подклассов
+
+
+def _import_path(path: str):
+    """
+    Импортирует класс по пути "пакет.модуль:Класс" или "пакет.модуль.Класс"
+    """
+    module_name, sep, attr = path.partition(":")
+    if not sep:
+        module_name, _, attr = path.rpartition(".")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid model path {path!r}")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class ModelsRegistry:
+    """
+    Регистр моделей.
+    : _registry: загруженные классы по имени (как у ModelsRegistry в main.py)
+    : _pending: пути моделей, которые зарегистрированы лениво и еще не импортированы
+    : _tags: имена моделей по тегу, заполняется при регистрации без импорта
+    : _by_base: подклассы по базовому классу, заполняется при загрузке класса
+    """
+
+    def __init__(self):
+        self._registry = {}
+        self._pending = {}
+        self._tags = {}
+        self._by_base = {}
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _add(self, name, cls, tags=()):
+        with self._lock:
+            self._pending.pop(name, None)
+            previous = self._registry.get(name)
+            if previous is cls:
+                return
+            if previous is not None:
+                raise ValueError(f"Model {name!r} is already registered as {previous!r}")
+            self._registry[name] = cls
+            for tag in tags:
+                self._tags.setdefault(tag, {})[name] = None
+            for base in cls.__mro__[1:-1]:
+                self._by_base.setdefault(base, []).append(cls)
+            self._snapshot = None
+        cls.__models_registry__ = self._registry
+
+    def register(self, decorated_class=None, *, name=None, tags=()):
+        """
+        Декоратор для регистрации модели: @models.register или @models.register(tags=("blog",)).
+        Если модель была зарегистрирована лениво, декоратор сработает при ее импорте и заменит путь классом
+        """
+        def decorator(cls):
+            self._add(name or cls.__name__, cls, tags)
+            return cls
+
+        if decorated_class is None:
+            return decorator
+        return decorator(decorated_class)
+
+    def register_lazy(self, path: str, *, name=None, tags=()):
+        """
+        Регистрирует модель по пути "пакет.модуль:Класс" без импорта модуля.
+        : name: имя модели в регистре, по умолчанию - имя класса из пути
+        : tags: теги модели, by_tag находит ее без импорта остальных моделей
+        """
+        name = name or path.replace(":", ".").rpartition(".")[2]
+        with self._lock:
+            if name in self._registry or name in self._pending:
+                raise ValueError(f"Model {name!r} is already registered")
+            self._pending[name] = path
+            for tag in tags:
+                self._tags.setdefault(tag, {})[name] = None
+            self._snapshot = None
+
+    def get(self, name, default=None):
+        """
+        Возвращает модель по имени, импортируя ее при первом обращении
+        """
+        cls = self._registry.get(name)
+        if cls is not None:
+            return cls
+        path = self._pending.get(name)
+        if path is None:
+            return default
+        # импорт - вне блокировки: модуль может сам зарегистрировать модель декоратором register
+        cls = _import_path(path)
+        self._add(name, cls)
+        return cls
+
+    def __getitem__(self, name):
+        cls = self.get(name)
+        if cls is None:
+            raise KeyError(name)
+        return cls
+
+    def __contains__(self, name):
+        return name in self._registry or name in self._pending
+
+    def __iter__(self):
+        return iter(list(self._registry) + list(self._pending))
+
+    def __len__(self):
+        return len(self._registry) + len(self._pending)
+
+    def load_all(self):
+        """
+        Импортирует все лениво зарегистрированные модели
+        """
+        for name in list(self._pending):
+            self.get(name)
+
+    def by_tag(self, tag) -> tuple:
+        """
+        Возвращает модели с тегом tag. Импортируются только они
+        """
+        return tuple(self[name] for name in list(self._tags.get(tag, ())))
+
+    def subclasses_of(self, base) -> tuple:
+        """
+        Возвращает зарегистрированные подклассы base.
+        Базовый класс известен только после импорта, поэтому сначала загружаются все ленивые модели
+        """
+        self.load_all()
+        return tuple(self._by_base.get(base, ()))
+
+    def freeze(self) -> RegistrySnapshot:
+        """
+        Загружает все модели и возвращает неизменяемый снимок регистра.
+        Снимок кешируется до следующей регистрации, поиск в нем - обычное обращение к словарю без блокировок
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        self.load_all()
+        with self._lock:
+            snapshot = RegistrySnapshot(
+                models=MappingProxyType(dict(self._registry)),
+                by_tag=MappingProxyType({
+                    tag: tuple(self._registry[name] for name in names) for tag, names in self._tags.items()
+                }),
+                by_base=MappingProxyType({base: tuple(classes) for base, classes in self._by_base.items()}),
+            )
+            self._snapshot = snapshot
+        return snapshot
@@ -0,0 +1,172 @@
+"""
+Компактное хранение миллионов пользователей.
+Даже с slots=True каждый User - отдельный объект Python со своим int и str (~100 байт и больше).
+UserTable хранит те же данные по столбцам: id - в array('q'), имена - в одном буфере UTF-8 со смещениями.
+Объект пользователя создается только при обращении к строке таблицы.
+"""
+from array import array
+
+# множитель для хеширования id (золотое сечение * 2 ** 64), равномерно раскладывает даже подряд идущие id
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_EMPTY = -1
+
+
+class UserView:
+    """
+    Представление строки UserTable с тем же интерфейсом, что у User (id, username).
+    Значения читаются из столбцов таблицы при обращении к атрибутам.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return self._table.ids[self._row]
+
+    @property
+    def username(self) -> str:
+        return self._table.username_at(self._row)
+
+    def __eq__(self, other):
+        try:
+            return (self.id, self.username) == (other.id, other.username)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"User(id={self.id!r}, username={self.username!r})"
+
+
+class UserTable:
+    """
+    Столбцовое хранилище пользователей.
+    : ids: array('q') с id пользователей
+    : offsets: array('I') - начало имени каждой строки в буфере names, последний элемент - длина буфера
+    : names: bytearray с именами в UTF-8 подряд
+    Поиск по id - через хеш-таблицу с открытой адресацией в array('i') (номера строк), а не через dict,
+    который занимал бы около 100 байт на запись.
+    """
+
+    def __init__(self, users=()):
+        self.ids = array("q")
+        self.offsets = array("I", [0])
+        self.names = bytearray()
+        self._bits = 3
+        self._index = array("i", [_EMPTY]) * (1 << self._bits)
+        self.extend(users)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> UserView:
+        if row < 0:
+            row += len(self.ids)
+        if not 0 <= row < len(self.ids):
+            raise IndexError("UserTable index out of range")
+        return UserView(self, row)
+
+    def __iter__(self):
+        for row in range(len(self.ids)):
+            yield UserView(self, row)
+
+    def username_at(self, row: int) -> str:
+        return self.names[self.offsets[row]:self.offsets[row + 1]].decode()
+
+    def _slot(self, user_id: int) -> int:
+        return ((user_id * _HASH_MULTIPLIER) & _MASK64) >> (64 - self._bits)
+
+    def row_of(self, user_id: int) -> int:
+        """
+        Возвращает номер строки пользователя или -1, если такого id нет
+        """
+        mask = len(self._index) - 1
+        slot = self._slot(user_id)
+        while (row := self._index[slot]) != _EMPTY:
+            if self.ids[row] == user_id:
+                return row
+            slot = (slot + 1) & mask
+        return _EMPTY
+
+    def get(self, user_id: int, default=None):
+        """
+        Возвращает пользователя по id
+        """
+        row = self.row_of(user_id)
+        return default if row == _EMPTY else UserView(self, row)
+
+    def __contains__(self, user_id):
+        return self.row_of(user_id) != _EMPTY
+
+    def _index_row(self, row: int):
+        mask = len(self._index) - 1
+        slot = self._slot(self.ids[row])
+        while self._index[slot] != _EMPTY:
+            slot = (slot + 1) & mask
+        self._index[slot] = row
+
+    def _reserve(self, count: int):
+        """
+        Увеличивает хеш-таблицу так, чтобы она была заполнена не больше чем на 2/3
+        """
+        bits = self._bits
+        while count * 3 > (1 << bits) * 2:
+            bits += 1
+        if bits == self._bits:
+            return
+        self._bits = bits
+        self._index = array("i", [_EMPTY]) * (1 << bits)
+        for row in range(len(self.ids)):
+            self._index_row(row)
+
+    def append(self, user_id: int, username: str):
+        """
+        Добавляет пользователя
+        """
+        self.extend([(user_id, username)])
+
+    def extend(self, users):
+        """
+        Добавляет пользователей пачкой: пары (id, username) или объекты с атрибутами id и username.
+        Имена кодируются и копируются в буфер одной операцией
+        """
+        new_ids = []
+        encoded = []
+        seen = set()
+        for user in users:
+            user_id, username = (user.id, user.username) if hasattr(user, "username") else user
+            if user_id in seen or user_id in self:
+                raise ValueError(f"Duplicate user id {user_id}")
+            seen.add(user_id)
+            new_ids.append(user_id)
+            encoded.append(username.encode())
+        if not new_ids:
+            return
+
+        self._reserve(len(self.ids) + len(new_ids))
+        first_row = len(self.ids)
+        self.ids.extend(new_ids)
+        end = self.offsets[-1]
+        offsets = array("I")
+        for name in encoded:
+            end += len(name)
+            offsets.append(end)
+        self.offsets.extend(offsets)
+        self.names += b"".join(encoded)
+
+        for row in range(first_row, len(self.ids)):
+            self._index_row(row)
+
+    def nbytes(self) -> int:
+        """
+        Возвращает объем памяти под данные таблицы в байтах
+        """
+        return (
+            self.ids.itemsize * len(self.ids)
+            + self.offsets.itemsize * len(self.offsets)
+            + len(self.names)
+            + self._index.itemsize * len(self._index)
+        )
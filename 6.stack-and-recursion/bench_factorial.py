@@ -0,0 +1,60 @@
+"""
+Сравнение вариантов факториала: цикл fac и reduce(mul, ...) из main.py, дерево произведений,
+prime swing и math.factorial.
+Последовательное умножение квадратично от длины результата, поэтому для n больше SEQUENTIAL_LIMIT
+оно не запускается (для n = 10 ** 6 это несколько минут).
+Рекурсивные варианты из main.py не участвуют: они упираются в лимит рекурсии уже при n порядка тысяч.
+Запуск: python bench_factorial.py
+
+Результаты:
+           fac(100_000): 4.559 s
+    fac_reduce(100_000): 3.705 s
+factorial_split(100_000): 0.302 s
+factorial_swing(100_000): 0.195 s
+math.factorial(100_000): 0.224 s
+factorial_split(1_000_000): 14.950 s
+factorial_swing(1_000_000): 9.041 s
+math.factorial(1_000_000): 12.481 s
+"""
+import math
+from functools import reduce
+from operator import mul
+from timeit import default_timer
+
+from factorial import factorial_split, factorial_swing
+
+SEQUENTIAL_LIMIT = 100_000
+
+
+def fac(n):
+    result = 1
+
+    for i in range(1, n + 1):
+        result *= i
+
+    return result
+
+
+def fac_reduce(n):
+    return reduce(mul, range(1, n + 1), 1)
+
+
+def main():
+    sequential = [fac, fac_reduce]
+    fast = [factorial_split, factorial_swing, math.factorial]
+
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        expected = None
+        for func in (sequential if n <= SEQUENTIAL_LIMIT else []) + fast:
+            start_time = default_timer()
+            result = func(n)
+            elapsed = default_timer() - start_time
+            if expected is None:
+                expected = result
+            assert result == expected, func.__name__
+            name = 'math.factorial' if func is math.factorial else func.__name__
+            print(f'{name:>16}({n:_}): {elapsed:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Сравнение хвостовой рекурсии через tail_recursion из main.py, trampoline и loop_tail_calls из trampoline.py
+с обычным циклом fac на factorial(100).
+Запуск: python bench_trampoline.py
+
+Результаты:
+                 fac(100): 6.9 us (1.0x fac)
+ factorial_dataclass(100): 110.5 us (16.0x fac)
+factorial_trampoline(100): 69.4 us (10.0x fac)
+      factorial_loop(100): 11.0 us (1.6x fac)
+
+Любой трамплин остается медленнее цикла в разы: на каждом шаге он вызывает функцию Python.
+Убрать вызовы можно только переписав функцию в цикл, как это делает loop_tail_calls.
+"""
+from dataclasses import dataclass, field
+from functools import wraps
+from timeit import timeit
+from typing import Any
+
+from trampoline import loop_tail_calls, tail, trampoline
+
+N = 100
+NUMBER = 20_000
+
+
+def fac(n):
+    result = 1
+
+    for i in range(1, n + 1):
+        result *= i
+
+    return result
+
+
+# tail_recursion из main.py
+@dataclass
+class TailCall:
+    args: tuple[Any, ...] = field(default_factory=tuple)
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+def tail_recursion(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = TailCall(args, kwargs)
+
+        while isinstance(result, TailCall):
+            result = func(*result.args, **result.kwargs)
+        return result
+
+    return wrapper
+
+
+def dataclass_tail(*args, **kwargs):
+    return TailCall(args, kwargs)
+
+
+@tail_recursion
+def factorial_dataclass(n, accumulator=1):
+    if n <= 2:
+        return n * accumulator
+    return dataclass_tail(n - 1, accumulator=accumulator * n)
+
+
+@trampoline
+def factorial_trampoline(n, accumulator=1):
+    if n <= 2:
+        return n * accumulator
+    return tail(n - 1, accumulator * n)
+
+
+@loop_tail_calls
+def factorial_loop(n, accumulator=1):
+    if n <= 2:
+        return n * accumulator
+    return factorial_loop(n - 1, accumulator * n)
+
+
+def main():
+    baseline = None
+    for func in (fac, factorial_dataclass, factorial_trampoline, factorial_loop):
+        assert func(N) == fac(N), func.__name__
+        elapsed = timeit(lambda: func(N), number=NUMBER) / NUMBER
+        baseline = baseline or elapsed
+        print(f'{func.__name__:>20}({N}): {elapsed * 1e6:.1f} us ({elapsed / baseline:.1f}x fac)')
+
+
+if __name__ == '__main__':
+    main()
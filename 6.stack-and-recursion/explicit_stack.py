@@ -0,0 +1,125 @@
+"""
+Рекурсия без стека вызовов.
+Обычная рекурсия хранит каждый уровень в стеке вызовов интерпретатора и падает с RecursionError после
+getrecursionlimit() уровней, а увеличение лимита через setrecursionlimit грозит переполнением стека C.
+Декоратор explicit_stack выполняет рекурсивную функцию-генератор на стеке-списке, как stack в main.py:
+вложенный вызов записывается через yield, генератор приостанавливается, а результат вызова
+возвращается в него через send. Глубина ограничена только памятью.
+
+@explicit_stack(memoize=True)
+def fib(n):
+    if n < 2:
+        return n
+    return (yield fib(n - 1)) + (yield fib(n - 2))
+
+fib(100_000)
+
+Внутри таких функций вызывать их (и другие функции с explicit_stack) нужно только через yield:
+без yield вызов вернет запись о вызове, а не результат.
+"""
+import inspect
+import threading
+from functools import wraps
+
+_local = threading.local()
+
+
+class _Call:
+    """
+    Запись о вложенном вызове, которую генератор передает через yield
+    """
+    __slots__ = ('func', 'cache', 'args', 'kwargs')
+
+    def __init__(self, func, cache, args, kwargs):
+        self.func = func
+        self.cache = cache
+        self.args = args
+        self.kwargs = kwargs
+
+    def key(self):
+        if not self.kwargs:
+            return self.args
+        return self.args, frozenset(self.kwargs.items())
+
+
+def _run(call: _Call):
+    """
+    Выполняет вызов call и все вложенные вызовы в цикле.
+    stack - генераторы, ожидающие результата вложенного вызова
+    """
+    stack = []
+    pending = call
+    value = None
+    error = None
+    _local.running = True
+    try:
+        while True:
+            if pending is not None:
+                key = pending.key() if pending.cache is not None else None
+                if key is not None and key in pending.cache:
+                    value = pending.cache[key]
+                else:
+                    generator = pending.func(*pending.args, **pending.kwargs)
+                    stack.append((generator, pending.cache, key))
+                    value = None
+                pending = None
+            if not stack:
+                return value
+
+            generator, cache, key = stack[-1]
+            try:
+                if error is not None:
+                    # исключение вложенного вызова поднимается в вызвавшем его генераторе, как при обычной рекурсии
+                    error, exception = None, error
+                    yielded = generator.throw(exception)
+                else:
+                    yielded = generator.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                if cache is not None:
+                    cache[key] = value
+                continue
+            except BaseException as exception:
+                stack.pop()
+                if not stack:
+                    raise
+                error = exception
+                continue
+
+            if type(yielded) is not _Call:
+                error = TypeError(f'expected a call of an explicit_stack function, got {yielded!r}')
+                continue
+            pending = yielded
+    finally:
+        _local.running = False
+        for generator, _, _ in reversed(stack):
+            generator.close()
+
+
+def explicit_stack(_func=None, *, memoize=False):
+    """
+    Декоратор для рекурсивных функций-генераторов.
+    : memoize: запоминать результаты по аргументам (аргументы должны быть хешируемыми)
+    """
+    def decorator(func):
+        if not inspect.isgeneratorfunction(func):
+            raise TypeError(f'{func.__qualname__} must be a generator function that yields recursive calls')
+        cache = {} if memoize else None
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            call = _Call(func, cache, args, kwargs)
+            if getattr(_local, 'running', False):
+                # вызов через yield изнутри другой функции - его выполнит уже работающий цикл _run
+                return call
+            return _run(call)
+
+        wrapper.cache = cache
+        if memoize:
+            wrapper.cache_clear = cache.clear
+        return wrapper
+
+    if _func is None:
+        return decorator
+    return decorator(_func)
@@ -0,0 +1,104 @@
+"""
+Быстрый факториал для больших n.
+fac и reduce(mul, ...) из main.py умножают большое число на маленькое n раз подряд:
+каждое умножение стоит O(размер результата), и всего выходит O(n ** 2) от длины числа.
+Здесь числа перемножаются попарно деревом (product), и большие множители одного размера умножаются
+алгоритмом Карацубы, который CPython использует для длинных чисел.
+factorial_swing дополнительно сокращает количество умножений через разложение на простые (prime swing).
+Рекурсии по n нет: глубина циклов и стека не зависит от n.
+"""
+from itertools import accumulate
+from operator import mul
+
+# факториалы от 0 до 100, вычисляются один раз при импорте
+SMALL_FACTORIALS = list(accumulate(range(1, 101), mul, initial=1))
+
+
+def product(numbers) -> int:
+    """
+    Произведение чисел деревом: соседние числа перемножаются попарно, пока не останется одно
+    """
+    numbers = list(numbers)
+    if not numbers:
+        return 1
+    while len(numbers) > 1:
+        paired = [a * b for a, b in zip(numbers[::2], numbers[1::2])]
+        if len(numbers) % 2:
+            paired.append(numbers[-1])
+        numbers = paired
+    return numbers[0]
+
+
+def _check(n):
+    if n < 0:
+        raise ValueError('factorial() not defined for negative values')
+
+
+def factorial_split(n: int) -> int:
+    """
+    Факториал произведением чисел от 1 до n деревом (binary splitting)
+    """
+    _check(n)
+    if n < len(SMALL_FACTORIALS):
+        return SMALL_FACTORIALS[n]
+    return product(range(2, n + 1))
+
+
+def primes_up_to(n: int) -> list[int]:
+    """
+    Простые числа до n включительно (решето Эратосфена на bytearray)
+    """
+    if n < 2:
+        return []
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, int(n ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, n + 1, i)))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+
+def _swing(n: int, primes: list[int]) -> int:
+    """
+    Swing-факториал n! / ((n // 2)!) ** 2.
+    Простое p входит в него в степени sum((n // p ** k) % 2 for k >= 1)
+    """
+    factors = []
+    for p in primes:
+        if p > n:
+            break
+        exponent, q = 0, n
+        while q:
+            q //= p
+            exponent += q & 1
+        if exponent:
+            factors.append(p ** exponent)
+    return product(factors)
+
+
+def factorial_swing(n: int) -> int:
+    """
+    Факториал через prime swing: n! = ((n // 2)!) ** 2 * swing(n).
+    Цепочка n, n // 2, n // 4, ... обходится циклом от маленьких значений к большим
+    """
+    _check(n)
+    chain = []
+    while n >= len(SMALL_FACTORIALS):
+        chain.append(n)
+        n //= 2
+    result = SMALL_FACTORIALS[n]
+    if chain:
+        primes = primes_up_to(chain[0])
+        for m in reversed(chain):
+            result = result * result * _swing(m, primes)
+    return result
+
+
+def factorial(n: int) -> int:
+    """
+    Факториал n: маленькие - из таблицы, большие - через prime swing
+    """
+    _check(n)
+    if n < len(SMALL_FACTORIALS):
+        return SMALL_FACTORIALS[n]
+    return factorial_swing(n)
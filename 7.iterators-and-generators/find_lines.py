@@ -0,0 +1,75 @@
+"""
+Поиск строк с подстрокой в больших файлах.
+Цикл for line in open(file) из main.py декодирует каждую строку в str и проверяет ее в интерпретаторе,
+поэтому скорость ограничена обработкой строк по одной, а не диском.
+Здесь файл читается в двоичном режиме большими блоками, подстрока ищется в bytes методом find (на C),
+а декодируются только найденные строки. Генераторы отдают строку вместе со смещением ее начала в байтах.
+
+for offset, line in find_lines('app.log', 'ERROR'):
+    print(offset, line)
+"""
+import mmap
+
+CHUNK_SIZE = 1 << 20
+
+
+def _encode(token, encoding):
+    token = token.encode(encoding) if isinstance(token, str) else bytes(token)
+    if not token:
+        raise ValueError('token must not be empty')
+    if b'\n' in token:
+        raise ValueError('token must not contain a newline')
+    return token
+
+
+def _matches(data, token, start, end, base, encoding):
+    """
+    Строки data[start:end] (только целые строки), в которых есть token.
+    base - смещение data в файле
+    """
+    position = data.find(token, start, end)
+    while position != -1:
+        line_start = max(data.rfind(b'\n', start, position) + 1, start)
+        line_end = data.find(b'\n', position, end)
+        if line_end == -1:
+            line_end = end
+        line = data[line_start:line_end]
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        yield base + line_start, line.decode(encoding)
+        start = line_end + 1
+        position = data.find(token, start, end)
+
+
+def find_lines(path, token, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+    """
+    Читает файл блоками по chunk_size байт и возвращает (смещение, строка) для строк, содержащих token.
+    Неполная последняя строка блока переносится в начало следующего, поэтому совпадения на границе блоков
+    не теряются и не повторяются
+    """
+    token = _encode(token, encoding)
+    base = 0
+    tail = b''
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            data = tail + chunk if tail else chunk
+            end = data.rfind(b'\n') + 1
+            yield from _matches(data, token, 0, end, base, encoding)
+            tail = data[end:]
+            base += end
+    if tail:
+        yield from _matches(tail, token, 0, len(tail), base, encoding)
+
+
+def find_lines_mmap(path, token, encoding='utf-8'):
+    """
+    То же через mmap: файл отображается в память целиком, и поиск идет по нему без копирования блоков
+    """
+    token = _encode(token, encoding)
+    with open(path, 'rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # пустой файл нельзя отобразить в память
+            return
+        with data:
+            yield from _matches(data, token, 0, len(data), 0, encoding)
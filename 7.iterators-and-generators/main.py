@@ -112,6 +112,13 @@ with open(file, 'r', encoding='utf-8') as file:
     print('one more line')
     print(repr(next(file)))
 
+# для больших файлов (логи на гигабайты) быстрее искать подстроку в bytes большими блоками
+# и декодировать только найденные строки - см. find_lines.py
+# from find_lines import find_lines
+#
+# for offset, line in find_lines('file.txt', '7'):
+#     print(offset, line)
+
 # генератор можно использовать только один раз
 # итераторы и генераторы помогают обходить коллекции,
 # зная только текущий элемент, тем самым помогая экономить ресурсы